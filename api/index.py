@@ -1,6 +1,9 @@
 # Vercel serverless entry point for the Flask app
 import os
 import tempfile
+import time
+
+_started = time.perf_counter()
 
 # Ensure a writable instance path for Flask on serverless FS
 _inst = os.path.join(tempfile.gettempdir(), "flask-instance")
@@ -12,5 +15,12 @@ os.environ.setdefault("INSTANCE_PATH", _inst)
 
 from app import create_app
 
+_imported = time.perf_counter()
+
 # Vercel expects a module-level `app`
 app = create_app()
+
+# Cold-start cost, shown by /health
+app.extensions["startup"]["import_ms"] = round((_imported - _started) * 1000, 1)
+app.extensions["startup"]["total_ms"] = round((time.perf_counter() - _started) * 1000, 1)
+app.logger.info("Cold start: %s", app.extensions["startup"])
@@ -1,13 +1,45 @@
 import os
 import tempfile
+import time
 from flask import Flask
 from flask_login import LoginManager
-from .models import db, User, Message, TaskCompletionRequest
+from sqlalchemy import event
+from . import identity, migrations, notifications
+from .assets import assets_bp
+from .models import db
 from .i18n import i18n_bp, init_i18n
+from .metrics import init_metrics
+from .slowlog import init_slowlog
 from .pwa import pwa_bp
+from .seed import seed_command
+
+
+def _init_statement_timeout(app) -> None:
+    """SET LOCAL the statement timeout as each transaction begins.
+
+    Behind a transaction-mode pooler a session setting would leak to other
+    clients' transactions (or be lost), so it is repeated per transaction.
+    """
+    timeout_ms = app.config.get("DB_TRANSACTION_STATEMENT_TIMEOUT_MS", 0)
+    if not timeout_ms:
+        return
+
+    def begin(conn):
+        # On the DBAPI connection: executing through ``conn`` would re-enter
+        # the transaction that is still being started. psycopg2 opens the
+        # server-side transaction with this statement.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, "begin", begin)
 
 
 def create_app():
+    started = time.perf_counter()
     base_tmp = os.environ.get("INSTANCE_PATH") or tempfile.gettempdir()
     instance_dir = os.path.join(base_tmp, "flask-instance")
     try:
@@ -21,6 +53,7 @@ def create_app():
 
     # Init extensions
     db.init_app(app)
+    _init_statement_timeout(app)
 
     login_manager = LoginManager()
     login_manager.login_view = "auth.login"
@@ -29,47 +62,51 @@ def create_app():
     @login_manager.user_loader
     def load_user(user_id):
         try:
-            return User.query.get(int(user_id))
+            return identity.load(int(user_id))
         except Exception:
             return None
 
     # Register blueprints
     from .auth import auth_bp
+    from .jobs import jobs_bp
     from .routes import main_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
+    app.register_blueprint(jobs_bp)
     app.register_blueprint(i18n_bp)
 
     # i18n helpers
     init_i18n(app)
     app.register_blueprint(pwa_bp)
+    app.register_blueprint(assets_bp)
+
+    # Request/SQL timings: Server-Timing header and /metrics
+    init_metrics(app)
+    init_slowlog(app)
+
+    app.cli.add_command(seed_command)
 
-    # Create tables if not exist
+    # Create tables and apply pending schema migrations; a single SELECT
+    # when the stored schema version is already current
+    schema_started = time.perf_counter()
     with app.app_context():
-        db.create_all()
+        version = migrations.upgrade(db.engine)
+    finished = time.perf_counter()
+    # Reported by /health; entry points may add their import time
+    app.extensions["startup"] = {
+        "create_app_ms": round((finished - started) * 1000, 1),
+        "schema_ms": round((finished - schema_started) * 1000, 1),
+        "schema_version": version,
+    }
 
     @app.context_processor
     def inject_notifications():  # type: ignore
-        from flask_login import current_user
-        msg_count = 0
-        approvals_count = 0
-        try:
-            if current_user.is_authenticated:
-                msg_count = (
-                    Message.query.filter_by(receiver_id=current_user.id, read_at=None).count()
-                )
-                if getattr(current_user, "role", None) in {"owner", "admin"}:
-                    approvals_count = TaskCompletionRequest.query.filter_by(status="pending").count()
-                else:
-                    approvals_count = TaskCompletionRequest.query.filter_by(
-                        status="pending", requested_by_id=current_user.id
-                    ).count()
-        except Exception:
-            pass
+        # Resolved on first use, so pages that never show the badges run no
+        # queries; shares the request's summary with /notifications/poll
         return {
-            "notif_messages": msg_count,
-            "notif_approvals": approvals_count,
+            "notif_messages": notifications.MESSAGES_BADGE,
+            "notif_approvals": notifications.APPROVALS_BADGE,
         }
 
     return app
@@ -0,0 +1,125 @@
+"""Content-hashed, minified static assets.
+
+Stylesheets and scripts are served from ``/assets/<name>.<hash>.<ext>``.
+The hash changes whenever the file does, so those URLs can be cached
+forever and deploys never leave clients with stale CSS or JS. The
+manifest is built from ``app/static`` once per process on first use;
+the service worker takes its precache list and cache name from it.
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, NamedTuple
+
+from flask import Blueprint, Response, abort, current_app, request, url_for
+
+
+assets_bp = Blueprint("assets", __name__)
+
+# Files under app/static served through the manifest
+ASSETS = ("styles.css", "notify.js")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class Asset(NamedTuple):
+    filename: str  # hashed name, e.g. styles.1a2b3c4d5e6f.css
+    digest: str
+    body: bytes
+    mimetype: str
+
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(source: str) -> str:
+    source = _CSS_COMMENT.sub("", source)
+    source = _CSS_SPACE.sub(" ", source)
+    source = _CSS_PUNCT.sub(r"\1", source)
+    # "prop: value" -> "prop:value"; the space before ":" is kept because
+    # in selectors it is a descendant combinator (".a :hover")
+    source = source.replace(": ", ":").replace(";}", "}")
+    return source.strip()
+
+
+def minify_js(source: str) -> str:
+    # Conservative: drop indentation, blank lines and whole-line comments but
+    # keep line breaks so automatic semicolon insertion is unaffected
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+_MINIFIERS = {
+    ".css": (minify_css, "text/css"),
+    ".js": (minify_js, "application/javascript"),
+}
+
+
+def build(static_folder: str) -> Dict[str, Asset]:
+    """Minify and fingerprint ``ASSETS``; keyed by both source and hashed name."""
+    manifest = {}
+    for name in ASSETS:
+        stem, ext = os.path.splitext(name)
+        minify, mimetype = _MINIFIERS[ext]
+        with open(os.path.join(static_folder, name), encoding="utf-8") as f:
+            body = minify(f.read()).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        asset = Asset(f"{stem}.{digest}{ext}", digest, body, mimetype)
+        manifest[name] = asset
+        manifest[asset.filename] = asset
+    return manifest
+
+
+_lock = threading.Lock()
+
+
+def manifest() -> Dict[str, Asset]:
+    app = current_app
+    built = app.extensions.get("assets")
+    if built is None:
+        with _lock:
+            built = app.extensions.get("assets")
+            if built is None:
+                built = app.extensions["assets"] = build(app.static_folder)
+    return built
+
+
+@assets_bp.app_template_global()
+def asset_url(name: str) -> str:
+    return url_for("assets.asset", filename=manifest()[name].filename)
+
+
+def precache_urls() -> list:
+    return [asset_url(name) for name in ASSETS]
+
+
+def version() -> str:
+    """Short digest over all assets, e.g. for cache names."""
+    combined = "".join(manifest()[name].digest for name in ASSETS)
+    return hashlib.sha256(combined.encode("ascii")).hexdigest()[:12]
+
+
+@assets_bp.route("/assets/<filename>")
+def asset(filename: str):
+    built = manifest()
+    current = built.get(filename)
+    if current is not None and current.filename == filename:
+        cache_control = IMMUTABLE
+    else:
+        # The bare source name or a hash from an earlier deploy (e.g. a page
+        # still cached by the service worker): serve today's file, but do
+        # not let it stick
+        stem, _, ext = filename.rpartition(".")
+        source = f"{stem.split('.')[0]}.{ext}"
+        if source not in ASSETS:
+            abort(404)
+        current = built[source]
+        cache_control = "public, no-cache"
+
+    response = Response(current.body, mimetype=current.mimetype)
+    response.set_etag(current.digest)
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
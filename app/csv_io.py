@@ -0,0 +1,258 @@
+"""Task CSV export and import."""
+import csv
+import io
+import itertools
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import insert, select
+
+from .models import Task, User, db
+
+
+EXPORT_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "assignee",
+    "created_at",
+    "updated_at",
+]
+
+
+def export_statement(assignee_id: Optional[int] = None):
+    """Flat rows for the export, assignee usernames joined in SQL."""
+    stmt = (
+        select(
+            Task.id,
+            Task.title,
+            Task.description,
+            Task.status,
+            Task.priority,
+            Task.due_date,
+            User.username,
+            Task.created_at,
+            Task.updated_at,
+        )
+        .outerjoin(User, User.id == Task.assignee_id)
+        .order_by(Task.id.asc())
+    )
+    if assignee_id is not None:
+        stmt = stmt.where(Task.assignee_id == assignee_id)
+    return stmt
+
+
+def iter_export(
+    assignee_id: Optional[int] = None,
+    bom: bool = False,
+    chunk_rows: int = 1000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """Yield the export CSV in chunks of ``chunk_rows`` rows.
+
+    Rows are fetched through a server-side cursor (``yield_per``), so memory
+    stays bounded by one batch of rows and one chunk of text regardless of
+    how many tasks are exported. ``progress`` receives the running row count.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if bom:
+        # UTF-8 BOM for better Excel compatibility on Windows when downloading
+        buf.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+
+    result = db.session.execute(
+        export_statement(assignee_id).execution_options(yield_per=chunk_rows)
+    )
+    rows = 0
+    for batch in result.partitions():
+        rows += len(batch)
+        for row in batch:
+            writer.writerow([
+                row.id,
+                row.title or "",
+                (row.description or "").replace("\r", " ").replace("\n", " "),
+                row.status or "",
+                row.priority or "",
+                row.due_date.isoformat() if row.due_date else "",
+                row.username or "",
+                row.created_at.isoformat(timespec="seconds"),
+                row.updated_at.isoformat(timespec="seconds"),
+            ])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        if progress:
+            progress(rows)
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+
+class ImportFormatError(ValueError):
+    """The upload could not be read as a CSV file with a header row."""
+
+
+SNIFF_CHARS = 4096
+MAX_REPORTED_ERRORS = 20
+
+
+def _open_text(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    # Decode incrementally; newline="" lets csv see \r\n, \r and \n endings as-is
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _reader(text) -> csv.DictReader:
+    """DictReader over ``text`` with the delimiter sniffed from its first lines."""
+    try:
+        head = []
+        size = 0
+        while size < SNIFF_CHARS:
+            line = text.readline()
+            if not line:
+                break
+            head.append(line)
+            size += len(line)
+        try:
+            delimiter = csv.Sniffer().sniff("".join(head), delimiters=",;\t").delimiter
+        except Exception:
+            delimiter = ","
+        reader = csv.DictReader(itertools.chain(head, text), delimiter=delimiter)
+        fieldnames = reader.fieldnames
+    except Exception as e:
+        raise ImportFormatError(str(e)) from e
+    if not fieldnames:
+        raise ImportFormatError("No header row detected")
+    return reader
+
+
+def _assignee_lookup():
+    """Username -> id, plus 'owner'/'admin' -> first user with that role."""
+    by_name = {}
+    by_role = {}
+    for uid, username, role in db.session.execute(
+        select(User.id, User.username, User.role).order_by(User.id.asc())
+    ):
+        by_name[username] = uid
+        by_role.setdefault(role, uid)
+    return by_name, by_role
+
+
+def import_tasks(
+    stream,
+    actor,
+    batch_size: int = 1000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> dict:
+    """Create tasks from a CSV upload and return a created/skipped/errors summary.
+
+    The file is decoded and parsed as it is read, assignees are resolved from
+    one prefetched map, and rows are written with multi-row INSERTs of
+    ``batch_size`` rows. ``progress`` receives the number of data rows read
+    after each batch. The caller commits.
+    """
+    try:
+        text = _open_text(stream)
+    except Exception as e:
+        raise ImportFormatError(str(e)) from e
+    try:
+        return _import_rows(_reader(text), actor, batch_size, progress)
+    finally:
+        if text is not stream:
+            # Hand the stream back open; a collected TextIOWrapper closes it
+            text.detach()
+
+
+def _import_rows(reader, actor, batch_size, progress) -> dict:
+    is_manager = actor.is_manager()
+    if is_manager:
+        by_name, by_role = _assignee_lookup()
+
+    created = 0
+    skipped = 0
+    errors = []
+    batch = []
+    rows_read = 0
+
+    def report(message):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(message)
+
+    def flush():
+        if batch:
+            db.session.execute(insert(Task), batch)
+            batch.clear()
+        if progress:
+            progress(rows_read)
+
+    for i, row in enumerate(reader, start=2):  # start at 2 to account for header row
+        rows_read += 1
+        # Normalize header keys to lowercase and trim values (surplus fields,
+        # collected by DictReader as a list under the None key, are ignored)
+        norm = {
+            (k or "").strip().lower(): (v or "").strip()
+            for k, v in row.items()
+            if k is not None
+        }
+
+        # Skip completely empty rows
+        if not any(norm.values()):
+            continue
+
+        title = norm.get("title", "")
+        status = norm.get("status", "todo")
+        priority = norm.get("priority", "medium")
+        due_date_str = norm.get("due_date", "")
+        assignee_name = norm.get("assignee", "")
+
+        if not title:
+            skipped += 1
+            report(f"Row {i}: missing title")
+            continue
+
+        if status not in {"todo", "in_progress", "done"}:
+            status = "todo"
+
+        if priority not in {"low", "medium", "high"}:
+            priority = "medium"
+
+        due_date = None
+        if due_date_str:
+            try:
+                due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                report(f"Row {i}: invalid due_date '{due_date_str}' (use YYYY-MM-DD)")
+
+        # Determine assignee respecting roles
+        if is_manager and assignee_name:
+            assignee_id = by_name.get(assignee_name)
+            if assignee_id is None and assignee_name.lower() in {"owner", "admin"}:
+                assignee_id = by_role.get(assignee_name.lower())
+            if assignee_id is None:
+                skipped += 1
+                report(f"Row {i}: unknown assignee '{assignee_name}'")
+                continue
+        else:
+            # Managers default to themselves; workers can only import for themselves
+            assignee_id = actor.id
+
+        batch.append({
+            "title": title,
+            "description": norm.get("description", ""),
+            "status": status,
+            "priority": priority,
+            "due_date": due_date,
+            "assignee_id": assignee_id,
+            "created_by_id": actor.id,
+        })
+        created += 1
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return {"created": created, "skipped": skipped, "errors": errors}
@@ -48,6 +48,15 @@ _t = {
         "send": "Send",
         "type_message": "Type your message",
         "no_messages": "No messages yet.",
+        "inbox": "Inbox",
+        "unread": "Unread",
+        "last_message": "Last message",
+        "you": "You",
+        "broadcast": "Broadcast",
+        "recipients": "Recipients",
+        "target_all": "All workers",
+        "target_open_tasks": "Workers with open tasks",
+        "target_selected": "Selected workers",
         "request_done": "Request Done",
         "pending_approval": "Pending approval",
         "approvals": "Approvals",
@@ -55,11 +64,24 @@ _t = {
         "reject": "Reject",
         "note": "Note",
         "decision_note": "Decision note",
+        "approve_selected": "Approve selected",
+        "reject_selected": "Reject selected",
+        "select_all": "Select all",
+        "slow_queries": "Slow queries",
+        "clear": "Clear",
+        "slow_log_off": "The slow-query log is off. Set %s to a threshold in milliseconds to record statements that take longer.",
+        "slow_log_threshold": "Statements slower than %s ms in this server process, newest first.",
+        "parameters": "Parameters",
+        "no_slow_queries": "No slow queries recorded.",
         "start": "Start",
         "back_to_todo": "Back to To Do",
         "save": "Save",
         "cancel": "Cancel",
         "no_tasks": "No tasks found.",
+        "next_page": "Next page",
+        "first_page": "First page",
+        "older_messages": "Older messages",
+        "newest_messages": "Newest messages",
         "import_title": "Import Tasks from CSV",
         "import_btn": "Import",
         "choose_file": "Choose File",
@@ -120,6 +142,15 @@ _t = {
         "send": "إرسال",
         "type_message": "اكتب رسالتك",
         "no_messages": "لا توجد رسائل.",
+        "inbox": "صندوق الوارد",
+        "unread": "غير مقروءة",
+        "last_message": "آخر رسالة",
+        "you": "أنت",
+        "broadcast": "رسالة جماعية",
+        "recipients": "المستلمون",
+        "target_all": "كل العمال",
+        "target_open_tasks": "العمال الذين لديهم مهام مفتوحة",
+        "target_selected": "العمال المحددون",
         "request_done": "طلب إنهاء",
         "pending_approval": "بانتظار الموافقة",
         "approvals": "الموافقات",
@@ -127,11 +158,24 @@ _t = {
         "reject": "رفض",
         "note": "ملاحظة",
         "decision_note": "ملاحظة القرار",
+        "approve_selected": "اعتماد المحدد",
+        "reject_selected": "رفض المحدد",
+        "select_all": "تحديد الكل",
+        "slow_queries": "الاستعلامات البطيئة",
+        "clear": "مسح",
+        "slow_log_off": "سجل الاستعلامات البطيئة متوقف. عيّن %s إلى حد بالمللي ثانية لتسجيل العبارات التي تستغرق وقتًا أطول.",
+        "slow_log_threshold": "العبارات الأبطأ من %s مللي ثانية في عملية الخادم هذه، الأحدث أولًا.",
+        "parameters": "المعاملات",
+        "no_slow_queries": "لم تُسجل استعلامات بطيئة.",
         "start": "بدء",
         "back_to_todo": "عودة إلى غير منجز",
         "save": "حفظ",
         "cancel": "إلغاء",
         "no_tasks": "لا توجد مهام.",
+        "next_page": "الصفحة التالية",
+        "first_page": "الصفحة الأولى",
+        "older_messages": "رسائل أقدم",
+        "newest_messages": "أحدث الرسائل",
         "import_title": "استيراد المهام من CSV",
         "import_btn": "استيراد",
         "choose_file": "اختر ملف",
@@ -0,0 +1,124 @@
+"""Short-lived cache of user identities for the login loader.
+
+Flask-Login loads the user on every authenticated request, including each
+notification poll. Entries keep the user's id, username and role for
+USER_CACHE_TTL seconds and are attached to the request's session without a
+SELECT; the password hash is not cached and loads on first access. Commits
+that add, change or delete users drop the affected entries in this
+process; other processes catch up when their entries expire.
+"""
+import threading
+import time
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import make_transient_to_detached
+
+from .models import User, db
+
+
+# Columns kept in the cache; anything else is loaded on access
+_COLUMNS = ("id", "username", "role")
+_MAX_ENTRIES = 4096
+
+_cache = {}
+_owner = None
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return current_app.config.get("USER_CACHE_TTL", 30)
+
+
+def _attach(values: dict) -> User:
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def load(user_id: int) -> Optional[User]:
+    """The user with ``user_id`` in the current session, or None."""
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(user_id)
+    if hit and hit[0] > now:
+        return _attach(hit[1])
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    values = {name: getattr(user, name) for name in _COLUMNS}
+    with _lock:
+        if len(_cache) >= _MAX_ENTRIES:
+            for k in [k for k, (exp, _) in _cache.items() if exp <= now] or list(_cache):
+                _cache.pop(k, None)
+        _cache[user_id] = (now + _ttl(), values)
+    return user
+
+
+def owner() -> Optional[User]:
+    """The owner account (first by id), cached like any other user."""
+    global _owner
+    now = time.monotonic()
+    with _lock:
+        hit = _owner
+    if hit and hit[0] > now:
+        owner_id = hit[1]
+    else:
+        owner_id = db.session.execute(
+            select(User.id).where(User.role == "owner").order_by(User.id).limit(1)
+        ).scalar()
+        with _lock:
+            _owner = (now + _ttl(), owner_id)
+    return load(owner_id) if owner_id is not None else None
+
+
+def invalidate(*user_ids) -> None:
+    """Drop cached identities for ``user_ids``, or for everyone if none given."""
+    global _owner
+    with _lock:
+        if not user_ids:
+            _cache.clear()
+        else:
+            for user_id in user_ids:
+                _cache.pop(user_id, None)
+        # Role changes and deletions can change who the owner is
+        _owner = None
+
+
+# Write tracking: collect changed users while flushing, invalidate on commit
+
+
+def _mark(session, value) -> None:
+    session.info.setdefault("identity_dirty", set()).add(value)
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            _mark(session, obj.id)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if getattr(orm_execute_state.statement, "table", None) is User.__table__:
+            _mark(orm_execute_state.session, None)
+
+
+@event.listens_for(db.session, "after_commit")
+def _flush_invalidations(session):
+    dirty = session.info.pop("identity_dirty", None)
+    if not dirty:
+        return
+    if None in dirty:
+        invalidate()
+    else:
+        invalidate(*dirty)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("identity_dirty", None)
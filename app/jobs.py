@@ -0,0 +1,320 @@
+"""In-process background jobs for long CSV imports and exports.
+
+Work runs on a bounded thread pool inside the web process, so no broker is
+needed; job state lives in the ``job`` table so any worker process can answer
+status requests. Uploaded files and export results are kept under
+``<instance_path>/jobs``.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import Blueprint, abort, current_app, jsonify, request, send_file, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import and_, func, select, update
+
+from . import csv_io
+from .models import Job, Task, User, db
+
+
+jobs_bp = Blueprint("jobs", __name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_active = 0
+
+# Minimum seconds between progress writes to the job row
+_PROGRESS_INTERVAL = 1.0
+
+
+def _get_executor(app):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config["JOB_WORKERS"], thread_name_prefix="job"
+            )
+        return _executor
+
+
+def _job_dir(app) -> str:
+    path = os.path.join(app.instance_path, "jobs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enabled(app=None) -> bool:
+    app = app or current_app
+    return app.config.get("JOB_WORKERS", 0) > 0
+
+
+@jobs_bp.app_template_global("jobs_enabled")
+def _jobs_enabled() -> bool:
+    return enabled()
+
+
+def _stale(app):
+    """Unfinished jobs showing no sign of life for JOB_STALE_SECONDS.
+
+    Their process went away (restart, deploy) and took the work with it. A
+    running job's progress writes keep it fresh (on Postgres; see
+    _progress_writer), so only the start time counts for short ones.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config.get("JOB_STALE_SECONDS", 600))
+    return and_(
+        Job.status.in_(("queued", "running")),
+        func.coalesce(Job.heartbeat_at, Job.started_at, Job.created_at) < cutoff,
+    )
+
+
+def _reap(app, *where) -> None:
+    """Mark stale jobs (optionally only those matching ``where``) failed."""
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(Job)
+            .where(_stale(app), *where)
+            .values(status="failed", error="abandoned", finished_at=datetime.utcnow())
+        )
+
+
+def _cleanup(app) -> None:
+    """Give up on stale jobs and remove job files older than JOB_RETENTION_SECONDS."""
+    _reap(app)
+    cutoff = time.time() - app.config.get("JOB_RETENTION_SECONDS", 86400)
+    path = _job_dir(app)
+    for name in os.listdir(path):
+        full = os.path.join(path, name)
+        try:
+            if os.path.getmtime(full) < cutoff:
+                os.remove(full)
+        except OSError:
+            pass
+
+
+def _set(job_id: str, **values) -> None:
+    # Separate short transaction so progress is visible while the job's own
+    # transaction is still open
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+
+def _run(app, job_id: str, work, *args) -> None:
+    global _active
+    with app.app_context():
+        try:
+            with db.engine.begin() as conn:
+                claimed = conn.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "queued")
+                    .values(status="running", started_at=datetime.utcnow())
+                ).rowcount
+            if not claimed:
+                # Reaped as stale while it waited in the queue
+                return
+            result = work(job_id, *args)
+            db.session.commit()
+            _set(
+                job_id,
+                status="done",
+                progress=func.coalesce(Job.total, Job.progress),
+                result=json.dumps(result),
+                finished_at=datetime.utcnow(),
+            )
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Job %s failed", job_id)
+            _set(job_id, status="failed", error=type(e).__name__, finished_at=datetime.utcnow())
+        finally:
+            db.session.remove()
+            with _executor_lock:
+                _active -= 1
+
+
+def submit(kind: str, work, *args) -> Job:
+    """Record a queued job and schedule ``work(job_id, *args)`` on the pool.
+
+    Raises RuntimeError when jobs are disabled or JOB_QUEUE_LIMIT jobs are
+    already queued or running in this process.
+    """
+    global _active
+    app = current_app._get_current_object()
+    if not enabled(app):
+        raise RuntimeError("background jobs are disabled")
+    with _executor_lock:
+        if _active >= app.config.get("JOB_QUEUE_LIMIT", 8):
+            raise RuntimeError("too many jobs in progress")
+        _active += 1
+    try:
+        job = Job(id=secrets.token_hex(16), kind=kind, user_id=current_user.id)
+        db.session.add(job)
+        db.session.commit()
+        _get_executor(app).submit(_run, app, job.id, work, *args)
+    except Exception:
+        with _executor_lock:
+            _active -= 1
+        raise
+    return job
+
+
+def _progress_writer(job_id: str):
+    last = 0.0
+    # SQLite allows one writer at a time and the job's own transaction holds
+    # it, so intermediate progress is only recorded on Postgres
+    live = db.engine.dialect.name != "sqlite"
+
+    def write(value: int) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if live and now - last >= _PROGRESS_INTERVAL:
+            last = now
+            _set(job_id, progress=value, heartbeat_at=datetime.utcnow())
+
+    return write
+
+
+def _import_work(job_id: str, path: str, user_id: int) -> dict:
+    actor = db.session.get(User, user_id)
+    write = _progress_writer(job_id)
+    try:
+        with open(path, "rb") as raw:
+            _set(job_id, total=os.fstat(raw.fileno()).st_size)
+            # Progress for imports is bytes consumed of the upload
+            result = csv_io.import_tasks(
+                raw,
+                actor,
+                batch_size=current_app.config.get("IMPORT_BATCH_SIZE", 1000),
+                progress=lambda rows: write(raw.tell()),
+            )
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return result
+
+
+def _export_work(job_id: str, assignee_id) -> dict:
+    count = select(func.count(Task.id))
+    if assignee_id is not None:
+        count = count.where(Task.assignee_id == assignee_id)
+    _set(job_id, total=db.session.execute(count).scalar() or 0)
+    write = _progress_writer(job_id)
+    rows = 0
+
+    def track(n: int) -> None:
+        nonlocal rows
+        rows = n
+        write(n)
+
+    with open(_export_path(current_app, job_id), "w", encoding="utf-8", newline="") as out:
+        for chunk in csv_io.iter_export(
+            assignee_id,
+            # Exports run as jobs are downloads: keep the Excel-friendly BOM
+            bom=True,
+            chunk_rows=current_app.config.get("EXPORT_CHUNK_ROWS", 1000),
+            progress=track,
+        ):
+            out.write(chunk)
+    return {"rows": rows}
+
+
+def _export_path(app, job_id: str) -> str:
+    return os.path.join(_job_dir(app), f"export-{job_id}.csv")
+
+
+def _job_json(job: Job):
+    data = {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "percent": (
+            100 if job.status == "done"
+            else round(100 * job.progress / job.total) if job.total else None
+        ),
+        "error": job.error,
+        "status_url": url_for("jobs.job_status", job_id=job.id),
+        "result_url": url_for("jobs.job_result", job_id=job.id),
+    }
+    if job.status == "done" and job.kind == "import" and job.result:
+        data["result"] = json.loads(job.result)
+    return data
+
+
+def _own_job_or_404(job_id: str) -> Job:
+    job = db.session.get(Job, job_id)
+    if job is None or job.user_id != current_user.id:
+        abort(404)
+    return job
+
+
+@jobs_bp.route("/jobs/import", methods=["POST"])
+@login_required
+def submit_import():
+    if not current_user.is_manager():
+        return jsonify(error="Only owners and admins can import tasks"), 403
+    file = request.files.get("file")
+    if not file or file.filename == "":
+        return jsonify(error="Please choose a CSV file to upload."), 400
+    # Refuse before storing the upload; the form then posts synchronously
+    if not enabled():
+        return jsonify(error="background jobs are disabled"), 503
+
+    _cleanup(current_app)
+    path = os.path.join(_job_dir(current_app), f"upload-{secrets.token_hex(8)}.csv")
+    file.save(path)
+    try:
+        job = submit("import", _import_work, path, current_user.id)
+    except RuntimeError as e:
+        os.remove(path)
+        return jsonify(error=str(e)), 503
+    return jsonify(_job_json(job)), 202
+
+
+@jobs_bp.route("/jobs/export", methods=["POST"])
+@login_required
+def submit_export():
+    # Owner exports all; workers export own tasks
+    assignee_id = None if current_user.is_manager() else current_user.id
+    _cleanup(current_app)
+    try:
+        job = submit("export", _export_work, assignee_id)
+    except RuntimeError as e:
+        return jsonify(error=str(e)), 503
+    return jsonify(_job_json(job)), 202
+
+
+@jobs_bp.route("/jobs/<job_id>")
+@login_required
+def job_status(job_id: str):
+    job = _own_job_or_404(job_id)
+    if job.status in ("queued", "running"):
+        # Pollers of a job whose process died get "failed" instead of
+        # waiting for the next submission to clean up
+        _reap(current_app, Job.id == job.id)
+        db.session.refresh(job)
+    return jsonify(_job_json(job))
+
+
+@jobs_bp.route("/jobs/<job_id>/result")
+@login_required
+def job_result(job_id: str):
+    job = _own_job_or_404(job_id)
+    if job.status != "done":
+        return jsonify(_job_json(job)), 409
+    if job.kind == "export":
+        path = _export_path(current_app, job.id)
+        if not os.path.exists(path):
+            return jsonify(error="Export file has expired"), 410
+        return send_file(
+            path,
+            mimetype="text/csv; charset=utf-8",
+            as_attachment=request.args.get("open") != "1",
+            download_name="tasks.csv",
+        )
+    return jsonify(json.loads(job.result or "{}"))
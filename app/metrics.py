@@ -0,0 +1,166 @@
+"""Per-request timing and SQL instrumentation.
+
+Engine events count statements and their time for the current request;
+request hooks add the total time, report all three in a ``Server-Timing``
+header and fold them into per-endpoint histograms. ``/metrics`` serves the
+histograms in the Prometheus text format.
+
+The numbers are per process: with several gunicorn workers each scrape
+reads the worker that answered it. For streamed responses (CSV export,
+event streams) the duration covers the view up to the first byte only.
+"""
+import hmac
+import threading
+import time
+from collections import defaultdict
+
+from flask import Blueprint, Response, abort, current_app, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+
+from .models import db
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_requests = defaultdict(int)  # (endpoint, method, status) -> count
+_histograms = {}  # (name, endpoint, method) -> Histogram
+
+_HISTOGRAMS = {
+    "http_request_duration_seconds": ("Time spent in the view", DURATION_BUCKETS),
+    "http_request_sql_queries": ("SQL statements per request", QUERY_BUCKETS),
+    "http_request_sql_duration_seconds": ("Time spent in SQL per request", DURATION_BUCKETS),
+}
+
+
+def _observe(endpoint: str, method: str, status: int, seconds: float, queries: int, sql: float):
+    with _lock:
+        _requests[(endpoint, method, str(status))] += 1
+        for name, value in (
+            ("http_request_duration_seconds", seconds),
+            ("http_request_sql_queries", queries),
+            ("http_request_sql_duration_seconds", sql),
+        ):
+            key = (name, endpoint, method)
+            hist = _histograms.get(key)
+            if hist is None:
+                hist = _histograms[key] = Histogram(_HISTOGRAMS[name][1])
+            hist.observe(value)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None and has_request_context():
+        g.sql_queries = g.get("sql_queries", 0) + 1
+        g.sql_seconds = g.get("sql_seconds", 0.0) + (time.perf_counter() - started)
+
+
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+def _record(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    seconds = time.perf_counter() - started
+    queries = g.get("sql_queries", 0)
+    sql = g.get("sql_seconds", 0.0)
+    # Rule endpoints, not paths, keep the label set bounded
+    endpoint = request.url_rule.endpoint if request.url_rule else "unmatched"
+    _observe(endpoint, request.method, response.status_code, seconds, queries, sql)
+    if current_app.config.get("SERVER_TIMING", True):
+        response.headers.add(
+            "Server-Timing",
+            f'app;dur={seconds * 1000:.1f}, sql;dur={sql * 1000:.1f};desc="{queries} queries"',
+        )
+    return response
+
+
+def init_metrics(app) -> None:
+    app.before_request(_start_timer)
+    app.after_request(_record)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+    app.register_blueprint(metrics_bp)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        requests = sorted(_requests.items())
+        histograms = sorted(
+            (key, list(h.counts), h.total, h.count) for key, h in _histograms.items()
+        )
+
+    lines = [
+        "# HELP http_requests_total Requests by endpoint, method and status",
+        "# TYPE http_requests_total counter",
+    ]
+    for (endpoint, method, status), count in requests:
+        lines.append(
+            f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+            f'status="{status}"}} {count}'
+        )
+    for name, (help_text, buckets) in _HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (hist_name, endpoint, method), counts, total, count in histograms:
+            if hist_name != name:
+                continue
+            labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+@metrics_bp.route("/metrics")
+def metrics():
+    # Scrapers send "Authorization: Bearer <METRICS_TOKEN>"; the owner may
+    # also look from a browser session
+    token = current_app.config.get("METRICS_TOKEN", "")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    allowed = bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+    if not allowed and not (current_user.is_authenticated and current_user.is_owner()):
+        abort(404)
+    response = Response(render(), mimetype="text/plain")
+    response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    response.headers["Cache-Control"] = "no-store"
+    return response
@@ -0,0 +1,220 @@
+"""Versioned schema migrations.
+
+``db.create_all()`` only creates missing tables; it never adds indexes or
+columns to tables that already exist, so deployed databases drift away from
+the models. Each step below runs once, in order, and the applied versions are
+recorded in the ``schema_version`` table.
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
+
+from .models import Job, db
+
+
+# Kept out of db.metadata so create_all() never touches it
+_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary constant for pg_advisory_xact_lock; serializes concurrent workers
+_LOCK_KEY = 727_401
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+
+    return register
+
+
+def head() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def _create_indexes(conn, *models) -> None:
+    for model in models:
+        for index in model.__table__.indexes:
+            # IF NOT EXISTS rather than checkfirst: reflection cannot see
+            # expression indexes on every backend
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _create_index(conn, name: str, table: str, columns: str, where: str = None) -> None:
+    """Create one index as spelled out here.
+
+    Migrations name their columns rather than reading the model, so a step
+    does the same thing however the model's indexes change later.
+    """
+    ddl = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+    if where:
+        ddl += f" WHERE {where}"
+    conn.execute(text(ddl))
+
+
+@migration(1, "initial schema")
+def _initial_schema(conn):
+    db.metadata.create_all(conn)
+
+
+@migration(2, "indexes for task, message and approval queries")
+def _hot_path_indexes(conn):
+    for name, table, columns, where in (
+        ("ix_task_assignee_status_due", "task", "assignee_id, status, due_date", None),
+        ("ix_task_status_due", "task", "status, due_date", None),
+        ("ix_task_created_by", "task", "created_by_id", None),
+        ("ix_message_receiver_read", "message", "receiver_id, read_at", None),
+        ("ix_message_sender", "message", "sender_id", None),
+        ("ix_message_unread", "message", "receiver_id, sender_id", "read_at IS NULL"),
+        ("ix_tcr_status_requested_by", "task_completion_request", "status, requested_by_id", None),
+        ("ix_tcr_task_status", "task_completion_request", "task_id, status", None),
+        ("ix_tcr_pending", "task_completion_request", "requested_by_id, task_id", "status = 'pending'"),
+    ):
+        _create_index(conn, name, table, columns, where)
+
+
+@migration(3, "task list keyset ordering index")
+def _task_order_index(conn):
+    _create_index(
+        conn, "ix_task_list_order", "task", "(due_date IS NULL), due_date, priority DESC, id"
+    )
+
+
+@migration(4, "task updated_at indexes for data versions")
+def _task_updated_indexes(conn):
+    _create_index(conn, "ix_task_updated", "task", "updated_at")
+    _create_index(conn, "ix_task_assignee_updated", "task", "assignee_id, updated_at")
+
+
+@migration(5, "background job table")
+def _job_table(conn):
+    Job.__table__.create(conn, checkfirst=True)
+    _create_indexes(conn, Job)
+
+
+@migration(6, "full-text search index for tasks")
+def _task_search(conn):
+    # See search.py; neither object is mapped on the model
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            "ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector"
+            " GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+            ") STORED"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin (search_vector)"
+        ))
+    elif conn.dialect.name == "sqlite":
+        options = {row[0] for row in conn.execute(text("PRAGMA compile_options"))}
+        if "ENABLE_FTS5" not in options:
+            return
+        for statement in (
+            "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+            "title, description, content='task', content_rowid='id')",
+            "CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN "
+            "INSERT INTO task_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END",
+            "CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END",
+            "CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description "
+            "ON task BEGIN "
+            "INSERT INTO task_fts(task_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO task_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END",
+            # Index the rows that already exist
+            "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+        ):
+            conn.execute(text(statement))
+
+
+@migration(7, "message thread paging index")
+def _message_thread_index(conn):
+    _create_index(conn, "ix_message_thread", "message", "sender_id, receiver_id, created_at, id")
+
+
+@migration(8, "message inbox index")
+def _message_inbox_index(conn):
+    _create_index(conn, "ix_message_inbox", "message", "receiver_id, sender_id, created_at")
+
+
+@migration(9, "seekable task list ordering index")
+def _task_due_order_index(conn):
+    # A cursor can range-scan a single leading expression, which the
+    # (due_date IS NULL), due_date pair of ix_task_list_order did not allow
+    _create_index(
+        conn, "ix_task_due_order", "task", "coalesce(due_date, '9999-12-31'), priority DESC, id"
+    )
+    conn.execute(text("DROP INDEX IF EXISTS ix_task_list_order"))
+
+
+@migration(10, "job heartbeat column")
+def _job_heartbeat(conn):
+    # Created by migration 1 on databases that start at this schema
+    if "heartbeat_at" not in {c["name"] for c in inspect(conn).get_columns("job")}:
+        conn.execute(text("ALTER TABLE job ADD COLUMN heartbeat_at TIMESTAMP"))
+
+
+def current_version(conn) -> int:
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def stored_version(engine):
+    """The recorded schema version, or None if it cannot be read."""
+    try:
+        with engine.connect() as conn:
+            return current_version(conn)
+    except DBAPIError:
+        # No schema_version table yet
+        return None
+
+
+def upgrade(engine) -> int:
+    """Apply pending migrations and return the resulting schema version."""
+    # Fast path for the usual (cold) start: one SELECT, no lock and no
+    # catalog queries when nothing is pending
+    version = stored_version(engine)
+    if version is not None and version >= head():
+        return version
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        schema_version.create(conn, checkfirst=True)
+        version = current_version(conn)
+        for number, description, fn in MIGRATIONS:
+            if number <= version:
+                continue
+            fn(conn)
+            conn.execute(
+                schema_version.insert().values(
+                    version=number, description=description, applied_at=datetime.utcnow()
+                )
+            )
+            version = number
+    return version
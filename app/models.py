@@ -62,6 +62,28 @@ class Task(db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    # Search relevance, only loaded for searches (see search.apply)
+    search_rank = db.query_expression()
+
+    __table_args__ = (
+        # Worker views: own tasks, optionally by status, ordered by due date
+        db.Index("ix_task_assignee_status_due", "assignee_id", "status", "due_date"),
+        # Manager views: status filter ordered by due date
+        db.Index("ix_task_status_due", "status", "due_date"),
+        db.Index("ix_task_created_by", "created_by_id"),
+        # Newest-change lookups for conditional GET (see versioning.data_version)
+        db.Index("ix_task_updated", "updated_at"),
+        db.Index("ix_task_assignee_updated", "assignee_id", "updated_at"),
+        # Matches the task list keyset ordering (see routes.TASK_ORDER)
+        db.Index(
+            "ix_task_due_order",
+            db.text("coalesce(due_date, '9999-12-31')"),
+            db.text("priority DESC"),
+            "id",
+        ),
+    )
+
+
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -73,6 +95,23 @@ class Message(db.Model):
     sender = db.relationship("User", foreign_keys=[sender_id])
     receiver = db.relationship("User", foreign_keys=[receiver_id])
 
+    __table_args__ = (
+        db.Index("ix_message_receiver_read", "receiver_id", "read_at"),
+        db.Index("ix_message_sender", "sender_id"),
+        # Conversation pages: each direction of a thread, newest first
+        db.Index("ix_message_thread", "sender_id", "receiver_id", "created_at", "id"),
+        # Inbox: the last message each worker sent to a manager
+        db.Index("ix_message_inbox", "receiver_id", "sender_id", "created_at"),
+        # Unread badge counts and per-sender unread lookups
+        db.Index(
+            "ix_message_unread",
+            "receiver_id",
+            "sender_id",
+            postgresql_where=db.text("read_at IS NULL"),
+            sqlite_where=db.text("read_at IS NULL"),
+        ),
+    )
+
 
 class TaskCompletionRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -88,3 +127,35 @@ class TaskCompletionRequest(db.Model):
     task = db.relationship("Task", foreign_keys=[task_id])
     requested_by = db.relationship("User", foreign_keys=[requested_by_id])
     decision_by = db.relationship("User", foreign_keys=[decision_by_id])
+
+    __table_args__ = (
+        db.Index("ix_tcr_status_requested_by", "status", "requested_by_id"),
+        db.Index("ix_tcr_task_status", "task_id", "status"),
+        # Pending approvals are a small, hot subset of all requests
+        db.Index(
+            "ix_tcr_pending",
+            "requested_by_id",
+            "task_id",
+            postgresql_where=db.text("status = 'pending'"),
+            sqlite_where=db.text("status = 'pending'"),
+        ),
+    )
+
+
+class Job(db.Model):
+    """A long-running import/export executed off the request thread (see app.jobs)."""
+
+    id = db.Column(db.String(32), primary_key=True)  # random hex, not guessable
+    kind = db.Column(db.String(20), nullable=False)  # import | export
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued|running|done|failed
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # last progress write
+
+    __table_args__ = (db.Index("ix_job_user_created", "user_id", "created_at"),)
@@ -0,0 +1,255 @@
+"""Notification badge summary shared by the navbar and /notifications/poll.
+
+The whole summary (unread messages, pending approvals and the task ids to
+highlight) is computed with one UNION ALL statement and cached per user for
+a few seconds. Commits that touch messages, tasks or completion requests
+invalidate the affected entries in this process and wake any open event
+streams; other processes catch up when their entries expire.
+"""
+import hashlib
+import threading
+import time
+from typing import List, NamedTuple
+
+from flask import current_app, g
+from flask_login import current_user
+from sqlalchemy import event, exists, func, literal_column, select, union_all
+
+from .models import Message, Task, TaskCompletionRequest, User, db
+
+
+class Summary(NamedTuple):
+    messages: int
+    approvals: int
+    pending_task_ids: List[int]
+
+
+EMPTY = Summary(0, 0, [])
+
+_MAX_ENTRIES = 4096
+_ALL = object()
+
+_cache = {}
+_lock = threading.Lock()
+
+# Bumped on every invalidation so event streams can wait for changes
+_changed = threading.Condition()
+_generation = 0
+_streams = 0
+
+
+def _summary_statement(user_id: int, is_manager: bool):
+    unread = (Message.receiver_id == user_id) & Message.read_at.is_(None)
+    pending = TaskCompletionRequest.status == "pending"
+    if not is_manager:
+        pending = pending & (TaskCompletionRequest.requested_by_id == user_id)
+
+    messages = select(literal_column("'m'"), func.count()).select_from(Message).where(unread)
+    approvals = (
+        select(literal_column("'a'"), func.count())
+        .select_from(TaskCompletionRequest)
+        .where(pending)
+    )
+    # Pending tasks for attention (exclude ones already done)
+    pending_tasks = (
+        select(literal_column("'t'"), TaskCompletionRequest.task_id)
+        .join(Task, Task.id == TaskCompletionRequest.task_id)
+        .where(pending, Task.status != "done")
+    )
+    # Also highlight task cards if there are unread chat messages
+    if is_manager:
+        # Manager: tasks assigned to workers who have unread messages for them
+        unread_senders = select(Message.sender_id).where(unread)
+        chat_tasks = select(literal_column("'t'"), Task.id).where(
+            Task.assignee_id.in_(unread_senders), Task.status != "done"
+        )
+    else:
+        # Worker: own active tasks if there are unread messages from the owner
+        owner_id = (
+            select(User.id).where(User.role == "owner").order_by(User.id).limit(1).scalar_subquery()
+        )
+        chat_tasks = select(literal_column("'t'"), Task.id).where(
+            Task.assignee_id == user_id,
+            Task.status != "done",
+            exists().where(unread, Message.sender_id == owner_id),
+        )
+    return union_all(messages, approvals, pending_tasks, chat_tasks)
+
+
+def compute(user_id: int, is_manager: bool) -> Summary:
+    messages = approvals = 0
+    task_ids = set()
+    for kind, value in db.session.execute(_summary_statement(user_id, is_manager)):
+        if kind == "m":
+            messages = int(value or 0)
+        elif kind == "a":
+            approvals = int(value or 0)
+        else:
+            task_ids.add(value)
+    return Summary(messages, approvals, sorted(task_ids))
+
+
+def summary_for(user) -> Summary:
+    """Cached summary for ``user``; recomputed after NOTIFY_CACHE_TTL seconds."""
+    return cached_summary(user.id, user.is_manager())
+
+
+def current_summary() -> Summary:
+    """Summary for the logged-in user, computed at most once per request."""
+    if "notify_summary" not in g:
+        summary = EMPTY
+        if current_user.is_authenticated:
+            try:
+                summary = summary_for(current_user)
+            except Exception:
+                db.session.rollback()
+        g.notify_summary = summary
+    return g.notify_summary
+
+
+class LazyCount:
+    """A badge count that is only looked up when a template reads it."""
+
+    __slots__ = ("field",)
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def __int__(self) -> int:
+        return int(getattr(current_summary(), self.field))
+
+    def __bool__(self) -> bool:
+        return int(self) > 0
+
+    def __str__(self) -> str:
+        return str(int(self))
+
+    __html__ = __str__
+
+
+MESSAGES_BADGE = LazyCount("messages")
+APPROVALS_BADGE = LazyCount("approvals")
+
+
+def cached_summary(user_id: int, is_manager: bool) -> Summary:
+    key = (user_id, is_manager)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    summary = compute(user_id, is_manager)
+    ttl = current_app.config.get("NOTIFY_CACHE_TTL", 10)
+    with _lock:
+        if len(_cache) >= _MAX_ENTRIES:
+            for k in [k for k, (exp, _) in _cache.items() if exp <= now] or list(_cache):
+                _cache.pop(k, None)
+        _cache[key] = (now + ttl, summary)
+    return summary
+
+
+def invalidate(*user_ids) -> None:
+    """Drop cached summaries for ``user_ids``, or for everyone if none given."""
+    with _lock:
+        if not user_ids:
+            _cache.clear()
+        else:
+            ids = set(user_ids)
+            for key in [k for k in _cache if k[0] in ids]:
+                del _cache[key]
+    global _generation
+    with _changed:
+        _generation += 1
+        _changed.notify_all()
+
+
+def generation() -> int:
+    with _changed:
+        return _generation
+
+
+def wait_for_change(since: int, timeout: float) -> int:
+    """Block until an invalidation after ``since`` or ``timeout``; return the generation."""
+    with _changed:
+        _changed.wait_for(lambda: _generation != since, timeout=timeout)
+        return _generation
+
+
+def fingerprint(summary: Summary) -> str:
+    raw = f"{summary.messages}|{summary.approvals}|{','.join(map(str, summary.pending_task_ids))}"
+    return hashlib.sha1(raw.encode("ascii")).hexdigest()[:16]
+
+
+def acquire_stream() -> bool:
+    """Reserve one of NOTIFY_STREAM_MAX_CLIENTS stream slots in this process."""
+    global _streams
+    limit = current_app.config.get("NOTIFY_STREAM_MAX_CLIENTS", 0)
+    with _lock:
+        if _streams >= limit:
+            return False
+        _streams += 1
+        return True
+
+
+def release_stream() -> None:
+    global _streams
+    with _lock:
+        _streams = max(0, _streams - 1)
+
+
+# Write tracking: collect affected users while flushing, invalidate on commit
+
+_WATCHED_TABLES = {Message.__table__, Task.__table__, TaskCompletionRequest.__table__}
+
+
+def _mark(session, value) -> None:
+    pending = session.info.setdefault("notify_dirty", set())
+    pending.add(value)
+
+
+@event.listens_for(db.session, "after_flush")
+def _track_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Message):
+            # Badge counts only depend on the receiver side of a message
+            _mark(session, obj.receiver_id)
+        elif isinstance(obj, (Task, TaskCompletionRequest)):
+            # Approval counts are global for managers; reset everyone
+            _mark(session, _ALL)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    if getattr(orm_execute_state.statement, "table", None) not in _WATCHED_TABLES:
+        return
+    # Bulk statements can name the users whose counts they change with the
+    # "notify_users" execution option; otherwise everyone is reset
+    users = orm_execute_state.execution_options.get("notify_users")
+    if users is None:
+        _mark(orm_execute_state.session, _ALL)
+    else:
+        for user_id in users:
+            _mark(orm_execute_state.session, user_id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _flush_invalidations(session):
+    dirty = session.info.pop("notify_dirty", None)
+    if not dirty:
+        return
+    if _ALL in dirty:
+        invalidate()
+    else:
+        invalidate(*dirty)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("notify_dirty", None)
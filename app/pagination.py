@@ -0,0 +1,133 @@
+"""Keyset (cursor) pagination.
+
+OFFSET paging makes the database walk and discard every skipped row, so deep
+pages get slower as tables grow. Keyset paging instead remembers the sort key
+of the last row on a page and asks for rows strictly after it, which an index
+on the same ordering can answer directly.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from sqlalchemy import and_, literal, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class SortKey(NamedTuple):
+    expr: Any
+    getter: Callable[[Any], Any]
+    desc: bool = False
+    nullable: bool = False
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise InvalidCursor("unknown cursor value")
+    return value
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+# Range of the BIGINT/INTEGER columns keys are drawn from
+_INT_MIN, _INT_MAX = -(2**63), 2**63 - 1
+
+
+def _check(key: SortKey, value):
+    """Reject a decoded value the key's column could not have produced."""
+    if value is None:
+        if not key.nullable:
+            raise InvalidCursor("unexpected null in cursor")
+        return value
+    try:
+        expected = key.expr.type.python_type
+    except NotImplementedError:
+        return value
+    # Exact type match: bool is an int and datetime is a date, but neither
+    # is a valid value for the other's column
+    if type(value) is not expected and not (expected is float and type(value) is int):
+        raise InvalidCursor("cursor value has the wrong type")
+    if type(value) is int and not _INT_MIN <= value <= _INT_MAX:
+        raise InvalidCursor("cursor value out of range")
+    return value
+
+
+def decode_cursor(token: str, keys: List[SortKey]) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor("cursor does not match the sort order")
+        return [_check(k, _load(v)) for k, v in zip(keys, values)]
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def order_by(keys: List[SortKey]) -> list:
+    return [k.expr.desc() if k.desc else k.expr.asc() for k in keys]
+
+
+def after(keys: List[SortKey], values: list):
+    """Row-value comparison ``keys > values`` honouring per-key direction.
+
+    The OR chain alone is not sargable, so it is ANDed with a range on the
+    leading key (``k0 >= v0``) that lets the index seek to the cursor
+    instead of scanning from the start of the ordering.
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        value = values[i]
+        if value is None:
+            # Nothing sorts strictly after NULL within the same prefix; a
+            # preceding IS NULL key handles the NULL/non-NULL boundary.
+            continue
+        prefix = [
+            k.expr.is_not_distinct_from(v) if k.nullable else k.expr == v
+            for k, v in zip(keys[:i], values[:i])
+        ]
+        bound = literal(value, key.expr.type)
+        step = key.expr < bound if key.desc else key.expr > bound
+        clauses.append(and_(*prefix, step))
+    if values[0] is None:
+        return or_(*clauses)
+    lead = keys[0].expr
+    bound = literal(values[0], lead.type)
+    seek = lead <= bound if keys[0].desc else lead >= bound
+    return and_(seek, or_(*clauses))
+
+
+def paginate(query, keys: List[SortKey], cursor: Optional[str], limit: int) -> Page:
+    """Return one page of ``query`` ordered by ``keys`` starting after ``cursor``."""
+    query = query.order_by(None).order_by(*order_by(keys))
+    if cursor:
+        query = query.filter(after(keys, decode_cursor(cursor, keys)))
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([k.getter(rows[-1]) for k in keys])
+    return Page(rows, next_cursor)
@@ -1,15 +1,28 @@
-from flask import Blueprint, Response, current_app, render_template, url_for
+from flask import Blueprint, Response, current_app, render_template, request, url_for
+from functools import lru_cache
+from . import assets as asset_manifest
+import base64
+import hashlib
 import io
-
-try:
-    from PIL import Image, ImageDraw
-except Exception:  # Pillow may not be installed yet
-    Image = None  # type: ignore
-    ImageDraw = None  # type: ignore
+import os
 
 
 pwa_bp = Blueprint("pwa", __name__)
 
+# Bump when the icon drawing changes; it is part of every icon URL, so
+# clients holding an "immutable" copy fetch the new one
+ICON_VERSION = 1
+
+# Fallback: tiny 1x1 transparent PNG
+_FALLBACK_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
+)
+
+
+@pwa_bp.app_template_global()
+def icon_url(size: int) -> str:
+    return url_for("pwa.icon", size=size, v=ICON_VERSION)
+
 
 @pwa_bp.route("/manifest.webmanifest")
 def manifest():
@@ -22,8 +35,8 @@ def manifest():
         "background_color": "#171207",
         "theme_color": "#000000",
         "icons": [
-            {"src": "/icons/192.png", "sizes": "192x192", "type": "image/png", "purpose": "any maskable"},
-            {"src": "/icons/512.png", "sizes": "512x512", "type": "image/png", "purpose": "any maskable"},
+            {"src": icon_url(192), "sizes": "192x192", "type": "image/png", "purpose": "any maskable"},
+            {"src": icon_url(512), "sizes": "512x512", "type": "image/png", "purpose": "any maskable"},
         ],
     }
     import json
@@ -37,19 +50,20 @@ def manifest():
 @pwa_bp.route("/service-worker.js")
 def service_worker():
     # Basic offline caching: precache core assets, network-first for navigations
-    css = url_for("static", filename="styles.css") + "?v=13"
     assets = [
         "/",
         "/tasks",
-        css,
-        "/icons/192.png",
-        "/icons/512.png",
+        *asset_manifest.precache_urls(),
+        icon_url(192),
+        icon_url(512),
         "/manifest.webmanifest",
         "/offline",
     ]
+    # A new cache per asset build; activate drops the old ones
+    cache_version = f"{asset_manifest.version()}-{ICON_VERSION}"
 
     js = f"""
-    const CACHE_NAME = 'tm-cache-v13';
+    const CACHE_NAME = 'tm-cache-{cache_version}';
     const ASSETS = {assets};
 
     self.addEventListener('install', (event) => {{
@@ -75,6 +89,9 @@ def service_worker():
       // Only same-origin GET requests
       if (req.method !== 'GET' || url.origin !== location.origin) return;
 
+      // Live data (notification poll/stream, JSON APIs, job status) must never be cached
+      if (['/notifications/', '/api/', '/jobs/'].some(p => url.pathname.startsWith(p))) return;
+
       // HTML navigations: network first with offline fallback
       if (req.mode === 'navigate') {{
         event.respondWith((async () => {{
@@ -91,7 +108,12 @@ def service_worker():
         return;
       }}
 
-      // Static assets: cache first
+      // Static assets: cache first. Anything else (chat and other JSON polls,
+      // XHR-style reads) goes to the network untouched; a cached answer for
+      // a fixed URL such as /messages/<id>/since would never change.
+      const isStatic = ['/assets/', '/icons/', '/static/'].some(p => url.pathname.startsWith(p))
+        || url.pathname === '/manifest.webmanifest';
+      if (!isStatic) return;
       event.respondWith((async () => {{
         const cache = await caches.open(CACHE_NAME);
         const cached = await cache.match(req);
@@ -110,20 +132,15 @@ def service_worker():
     return Response(js, mimetype="application/javascript")
 
 
-@pwa_bp.route("/icons/<int:size>.png")
-def icon(size: int):
-    # Generate a simple PNG icon on the fly to avoid storing binaries
-    # Colors match the app's theme
-    size = max(64, min(size, 1024))
-    if Image is None:
-        # Fallback: tiny 1x1 transparent PNG
-        b64 = (
-            "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
-        )
-        import base64
-
-        return Response(base64.b64decode(b64), mimetype="image/png")
+def _render_icon(size: int):
+    """PNG bytes for a ``size`` icon, or None when Pillow is unavailable."""
+    try:
+        # Imported lazily: only needed when an icon is not cached yet
+        from PIL import Image, ImageDraw
+    except Exception:  # Pillow may not be installed yet
+        return None
 
+    # Colors match the app's theme
     img = Image.new("RGBA", (size, size), "#4f46e5")  # primary color
     draw = ImageDraw.Draw(img)
     padding = size // 8
@@ -142,8 +159,50 @@ def icon(size: int):
 
     buf = io.BytesIO()
     img.save(buf, format="PNG")
-    buf.seek(0)
-    return Response(buf.getvalue(), mimetype="image/png")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=8)
+def _icon_png(size: int, cache_dir: str):
+    """Rendered icon from memory, the instance-dir cache or Pillow, in that order."""
+    path = os.path.join(cache_dir, f"icon-v{ICON_VERSION}-{size}.png")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    data = _render_icon(size)
+    if data is None:
+        return None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        # Read-only instance dir: the memory cache still applies
+        pass
+    return data
+
+
+@pwa_bp.route("/icons/<int:size>.png")
+def icon(size: int):
+    # Generated rather than stored to avoid keeping binaries in the repo
+    size = max(64, min(size, 1024))
+    data = _icon_png(size, os.path.join(current_app.instance_path, "icons"))
+    if data is None:
+        data = _FALLBACK_PNG
+        # Not immutable: the real icon should replace it once Pillow is installed
+        cache_control = "public, no-cache"
+    else:
+        cache_control = "public, max-age=31536000, immutable"
+
+    response = Response(data, mimetype="image/png")
+    response.set_etag(hashlib.sha1(data).hexdigest()[:16])
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
 
 
 @pwa_bp.route("/offline")
@@ -1,22 +1,27 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import NamedTuple
 
 from flask import (
     Blueprint,
     Response,
     jsonify,
     flash,
+    make_response,
     redirect,
     render_template,
     request,
+    stream_with_context,
     url_for,
 )
 from flask import current_app
 from flask_login import current_user, login_required
-from sqlalchemy import or_, text
+from sqlalchemy import exists, func, insert, literal_column, select, text, update
+from sqlalchemy.orm import aliased, joinedload
 
+from . import csv_io, identity, notifications, pagination, search, versioning
 from .models import Task, User, Message, TaskCompletionRequest, db
-import csv
-import io
+import json
+import time
 
 
 main_bp = Blueprint("main", __name__)
@@ -33,15 +38,37 @@ def index():
     return redirect(url_for("main.tasks"))
 
 
-@main_bp.route("/tasks")
-@login_required
-def tasks():
+# Due date with undated tasks sorting after every dated one. The sentinel is a
+# literal, not a bound parameter, so the expression is the one
+# ix_task_due_order is built on and cursors can seek into that index.
+TASK_DUE = func.coalesce(Task.due_date, literal_column("'9999-12-31'"), type_=db.Date)
+
+# Task list ordering: due date (undated last) and priority, with the primary
+# key as a tiebreak so every row has a unique, stable position.
+TASK_ORDER = [
+    pagination.SortKey(TASK_DUE, lambda t: t.due_date or date.max),
+    pagination.SortKey(Task.priority, lambda t: t.priority, desc=True),
+    pagination.SortKey(Task.id, lambda t: t.id),
+]
+
+
+def _search_order(rank) -> list:
+    """Search results: best match first, then by id."""
+    return [
+        pagination.SortKey(rank, lambda t: t.search_rank, desc=True),
+        pagination.SortKey(Task.id, lambda t: t.id),
+    ]
+
+
+MAX_PAGE_SIZE = 200
+
+
+def _task_list_query(is_manager: bool):
+    """The filtered task query and the sort keys to page it by."""
     status = request.args.get("status", "").strip()
     assignee_id = request.args.get("assignee", "").strip()
     q = request.args.get("q", "").strip()
 
-    is_manager = _is_manager()
-
     if is_manager:
         query = Task.query
     else:
@@ -53,31 +80,66 @@ def tasks():
     if assignee_id.isdigit() and is_manager:
         query = query.filter(Task.assignee_id == int(assignee_id))
 
+    order = TASK_ORDER
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Task.title.ilike(like), Task.description.ilike(like)))
+        query, rank = search.apply(query, q, db.engine)
+        if rank is not None:
+            query = query.options(db.with_expression(Task.search_rank, rank))
+            order = _search_order(rank)
+
+    return query.options(joinedload(Task.assignee), joinedload(Task.creator)), order
+
+
+def _page_size() -> int:
+    default = current_app.config.get("TASKS_PAGE_SIZE", 50)
+    limit = request.args.get("limit", type=int) or default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _pending_task_ids(task_ids, is_manager: bool) -> set:
+    """Ids among ``task_ids`` with a pending completion request (task not done)."""
+    if not task_ids:
+        return set()
+    pending_q = (
+        db.session.query(TaskCompletionRequest.task_id)
+        .join(Task, Task.id == TaskCompletionRequest.task_id)
+        .filter(
+            TaskCompletionRequest.status == "pending",
+            TaskCompletionRequest.task_id.in_(task_ids),
+            Task.status != "done",
+        )
+    )
+    if not is_manager:
+        pending_q = pending_q.filter(TaskCompletionRequest.requested_by_id == current_user.id)
+    return {task_id for (task_id,) in pending_q.distinct()}
 
-    query = query.order_by(Task.due_date.is_(None), Task.due_date.asc(), Task.priority.desc())
 
-    tasks_list = query.all()
-    users = User.query.order_by(User.username.asc()).all()
+@main_bp.route("/tasks")
+@login_required
+def tasks():
+    is_manager = _is_manager()
+    cursor = request.args.get("cursor", "").strip() or None
+
+    etag = versioning.etag_for("tasks", *versioning.data_version(current_user))
+    unchanged = versioning.not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        page = pagination.paginate(*_task_list_query(is_manager), cursor, _page_size())
+    except pagination.InvalidCursor:
+        args = request.args.to_dict(flat=True)
+        args.pop("cursor", None)
+        return redirect(url_for("main.tasks", **args))
+    tasks_list = page.items
+    # The assignee filter is only rendered for managers
+    users = User.query.order_by(User.username.asc()).all() if is_manager else []
 
     # For UI: pending completion requests per task (dict)
-    pending_map = {}
-    if is_manager:
-        pendings = TaskCompletionRequest.query.filter_by(status="pending").all()
-    else:
-        pendings = TaskCompletionRequest.query.filter_by(
-            status="pending", requested_by_id=current_user.id
-        ).all()
     # Only show pending badge if the task is not already done
-    for r in pendings:
-        try:
-            t = Task.query.get(r.task_id)
-            if t and t.status != "done":
-                pending_map[r.task_id] = True
-        except Exception:
-            continue
+    pending_map = {
+        task_id: True for task_id in _pending_task_ids([t.id for t in tasks_list], is_manager)
+    }
 
     # Owner id for workers to open chat with owner from task cards
     owner_id = None
@@ -88,16 +150,59 @@ def tasks():
         except Exception:
             owner_id = None
 
-    return render_template(
-        "tasks.html",
-        tasks=tasks_list,
-        users=users,
-        is_manager=is_manager,
-        pending_map=pending_map,
-        owner_id=owner_id,
+    args = request.args.to_dict(flat=True)
+    args.pop("cursor", None)
+    first_url = url_for("main.tasks", **args) if cursor else None
+    next_url = url_for("main.tasks", **args, cursor=page.next_cursor) if page.next_cursor else None
+
+    return versioning.tag(
+        make_response(
+            render_template(
+                "tasks.html",
+                tasks=tasks_list,
+                users=users,
+                is_manager=is_manager,
+                pending_map=pending_map,
+                owner_id=owner_id,
+                next_url=next_url,
+                first_url=first_url,
+            )
+        ),
+        etag,
     )
 
 
+@main_bp.route("/api/tasks")
+@login_required
+def tasks_api():
+    """JSON task listing with the same filters as /tasks, paged by cursor."""
+    is_manager = _is_manager()
+    cursor = request.args.get("cursor", "").strip() or None
+    try:
+        page = pagination.paginate(*_task_list_query(is_manager), cursor, _page_size())
+    except pagination.InvalidCursor:
+        return jsonify(error="invalid cursor"), 400
+
+    pending = _pending_task_ids([t.id for t in page.items], is_manager)
+    items = [
+        {
+            "id": t.id,
+            "title": t.title,
+            "description": t.description or "",
+            "status": t.status,
+            "priority": t.priority,
+            "due_date": t.due_date.isoformat() if t.due_date else None,
+            "assignee_id": t.assignee_id,
+            "assignee": t.assignee.username if t.assignee else None,
+            "pending_approval": t.id in pending,
+            "created_at": t.created_at.isoformat(timespec="seconds"),
+            "updated_at": t.updated_at.isoformat(timespec="seconds"),
+        }
+        for t in page.items
+    ]
+    return jsonify(items=items, next_cursor=page.next_cursor)
+
+
 @main_bp.route("/users")
 @login_required
 def users():
@@ -344,50 +449,31 @@ def delete_task(task_id: int):
 @main_bp.route("/tasks/export")
 @login_required
 def export_csv():
-    # Owner exports all; workers export own tasks
-    if _is_manager():
-        query = Task.query
-    else:
-        query = Task.query.filter(Task.assignee_id == current_user.id)
+    etag = versioning.etag_for("export", *versioning.data_version(current_user))
+    unchanged = versioning.not_modified(etag)
+    if unchanged is not None:
+        return unchanged
 
-    output = io.StringIO()
-    writer = csv.writer(output, lineterminator="\n")
-    writer.writerow([
-        "id",
-        "title",
-        "description",
-        "status",
-        "priority",
-        "due_date",
-        "assignee",
-        "created_at",
-        "updated_at",
-    ])
-    for t in query.order_by(Task.id.asc()).all():
-        writer.writerow([
-            t.id,
-            t.title or "",
-            (t.description or "").replace("\r", " ").replace("\n", " "),
-            t.status or "",
-            t.priority or "",
-            t.due_date.isoformat() if t.due_date else "",
-            t.assignee.username if t.assignee else "",
-            t.created_at.isoformat(timespec="seconds"),
-            t.updated_at.isoformat(timespec="seconds"),
-        ])
+    # Owner exports all; workers export own tasks
+    assignee_id = None if _is_manager() else current_user.id
 
     # Choose inline vs attachment based on query param
     inline = request.args.get("open") == "1"
-    data = output.getvalue()
-    if not inline:
-        # Prepend UTF-8 BOM for better Excel compatibility on Windows when downloading
-        data = "\ufeff" + data
+    # Prepend UTF-8 BOM for better Excel compatibility on Windows when downloading
+    chunks = csv_io.iter_export(
+        assignee_id,
+        bom=not inline,
+        chunk_rows=current_app.config.get("EXPORT_CHUNK_ROWS", 1000),
+    )
 
     disposition = ("inline" if inline else "attachment") + "; filename=tasks.csv"
-    return Response(
-        data,
-        mimetype="text/csv; charset=utf-8",
-        headers={"Content-Disposition": disposition},
+    return versioning.tag(
+        Response(
+            stream_with_context(chunks),
+            mimetype="text/csv; charset=utf-8",
+            headers={"Content-Disposition": disposition},
+        ),
+        etag,
     )
 
 
@@ -398,117 +484,27 @@ def import_csv():
         flash("Only owners and admins can import tasks")
         return redirect(url_for("main.tasks"))
     results = None
-    errors = []
     if request.method == "POST":
         file = request.files.get("file")
         if not file or file.filename == "":
             flash("Please choose a CSV file to upload.")
             return render_template("import.html", results=None)
 
-        # Read content as text with robust decoding and delimiter sniffing
         try:
             try:
                 file.stream.seek(0)
             except Exception:
                 pass
-
-            raw = file.read()
-            if isinstance(raw, str):
-                text = raw
-            else:
-                try:
-                    text = raw.decode("utf-8-sig")
-                except Exception:
-                    try:
-                        text = raw.decode("utf-8", errors="replace")
-                    except Exception:
-                        text = raw.decode("latin1", errors="replace")
-
-            # Normalize line endings
-            text = text.replace("\r\n", "\n").replace("\r", "\n")
-
-            sample = text[:4096]
-            try:
-                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
-                delimiter = dialect.delimiter
-            except Exception:
-                delimiter = ","
-
-            reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
-            if not reader.fieldnames:
-                raise ValueError("No header row detected")
-        except Exception:
+            results = csv_io.import_tasks(
+                file.stream,
+                current_user,
+                batch_size=current_app.config.get("IMPORT_BATCH_SIZE", 1000),
+            )
+        except csv_io.ImportFormatError:
+            db.session.rollback()
             flash("Could not read the CSV file. Ensure it is a valid text CSV.")
             return render_template("import.html", results=None)
-
-        created = 0
-        skipped = 0
-
-        for i, row in enumerate(reader, start=2):  # start at 2 to account for header row
-            # Normalize header keys to lowercase and trim values
-            norm = { (k or "").strip().lower(): (v or "").strip() for k, v in row.items() }
-
-            # Skip completely empty rows
-            if not any(norm.values()):
-                continue
-
-            title = norm.get("title", "")
-            description = norm.get("description", "")
-            status = norm.get("status", "todo")
-            priority = norm.get("priority", "medium")
-            due_date_str = norm.get("due_date", "")
-            assignee_name = norm.get("assignee", "")
-
-            if not title:
-                skipped += 1
-                errors.append(f"Row {i}: missing title")
-                continue
-
-            if status not in {"todo", "in_progress", "done"}:
-                status = "todo"
-
-            if priority not in {"low", "medium", "high"}:
-                priority = "medium"
-
-            due_date = None
-            if due_date_str:
-                try:
-                    due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    errors.append(
-                        f"Row {i}: invalid due_date '{due_date_str}' (use YYYY-MM-DD)"
-                    )
-
-            # Determine assignee respecting roles
-            if _is_manager():
-                assignee = None
-                if assignee_name:
-                    assignee = User.query.filter_by(username=assignee_name).first()
-                    if not assignee and assignee_name.lower() in {"owner", "admin"}:
-                        assignee = User.query.filter_by(role=assignee_name.lower()).first()
-                    if not assignee:
-                        skipped += 1
-                        errors.append(f"Row {i}: unknown assignee '{assignee_name}'")
-                        continue
-                else:
-                    assignee = current_user
-            else:
-                assignee = current_user  # workers can only import for themselves
-
-            task = Task(
-                title=title,
-                description=description,
-                status=status,
-                priority=priority,
-                due_date=due_date,
-                assignee_id=assignee.id,
-                created_by_id=current_user.id,
-            )
-            db.session.add(task)
-            created += 1
-
         db.session.commit()
-        results = {"created": created, "skipped": skipped, "errors": errors[:20]}
 
     return render_template("import.html", results=results)
 
@@ -535,142 +531,331 @@ def health():
         db_scheme=scheme,
         instance_path=current_app.instance_path,
         db_error=db_error,
+        startup=current_app.extensions.get("startup"),
     )
 
 
 @main_bp.route("/notifications/poll")
 @login_required
 def notifications_poll():
-    # Unread messages for current user
-    try:
-        msg_count = (
-            Message.query.filter_by(receiver_id=current_user.id, read_at=None).count()
-        )
-    except Exception:
-        msg_count = 0
+    summary = notifications.current_summary()
+    # The summary fingerprint is the data version for this endpoint
+    etag = versioning.etag_for("poll", notifications.fingerprint(summary))
+    unchanged = versioning.not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    return versioning.tag(
+        jsonify(
+            messages=summary.messages,
+            approvals=summary.approvals,
+            pending_task_ids=summary.pending_task_ids,
+        ),
+        etag,
+    )
 
-    # Approvals count
-    try:
-        if _is_manager():
-            appr_count = TaskCompletionRequest.query.filter_by(status="pending").count()
-        else:
-            appr_count = TaskCompletionRequest.query.filter_by(
-                status="pending", requested_by_id=current_user.id
-            ).count()
-    except Exception:
-        appr_count = 0
 
-    # Pending tasks for attention (exclude ones already done)
-    pending_ids = []
-    try:
-        if _is_manager():
-            pendings = TaskCompletionRequest.query.filter_by(status="pending").all()
-        else:
-            pendings = TaskCompletionRequest.query.filter_by(
-                status="pending", requested_by_id=current_user.id
-            ).all()
-        for r in pendings:
-            t = Task.query.get(r.task_id)
-            if t and t.status != "done":
-                pending_ids.append(t.id)
-    except Exception:
-        pass
+def _sse(event: str, data, event_id: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
 
-    # Also highlight task cards if there are unread chat messages
-    try:
-        # Collect senders that have unread messages for the current user
-        unread_msgs = Message.query.filter_by(receiver_id=current_user.id, read_at=None).all()
-        unread_senders = {m.sender_id for m in unread_msgs}
-        msg_task_ids = []
-        if unread_senders:
-            if _is_manager():
-                # Owner: highlight tasks assigned to workers who have unread messages
-                try:
-                    rows = (
-                        Task.query
-                        .with_entities(Task.id)
-                        .filter(Task.assignee_id.in_(list(unread_senders)))
-                        .filter(Task.status != "done")
-                        .all()
-                    )
-                    msg_task_ids = [r[0] if isinstance(r, tuple) else r.id for r in rows]
-                except Exception:
-                    msg_task_ids = []
-            else:
-                # Worker: highlight own active tasks if there are unread messages from owner
-                owner = _get_owner()
-                if owner and (owner.id in unread_senders):
-                    try:
-                        rows = (
-                            Task.query
-                            .with_entities(Task.id)
-                            .filter(Task.assignee_id == current_user.id)
-                            .filter(Task.status != "done")
-                            .all()
-                        )
-                        msg_task_ids = [r[0] if isinstance(r, tuple) else r.id for r in rows]
-                    except Exception:
-                        msg_task_ids = []
-        # Merge with existing pending ids (unique)
-        pending_ids = list({*pending_ids, *msg_task_ids})
-    except Exception:
-        pass
 
-    return jsonify(messages=msg_count, approvals=appr_count, pending_task_ids=pending_ids)
+@main_bp.route("/notifications/stream")
+@login_required
+def notifications_stream():
+    """Server-Sent Events version of /notifications/poll.
+
+    Emits ``tasks``, ``approvals`` and ``messages`` events when the matching
+    part of the summary changes, a comment heartbeat while idle, and ends
+    after NOTIFY_STREAM_MAX_SECONDS so the browser reconnects (resuming via
+    Last-Event-ID). Answers 204 when streaming is disabled or all slots are
+    busy, which tells EventSource to stop and notify.js to poll instead.
+    """
+    if not notifications.acquire_stream():
+        return Response(status=204)
+
+    cfg = current_app.config
+    user_id, is_manager = current_user.id, _is_manager()
+    last_id = request.headers.get("Last-Event-ID", "")
+    recheck = cfg.get("NOTIFY_STREAM_RECHECK", 5)
+    heartbeat = cfg.get("NOTIFY_STREAM_HEARTBEAT", 15)
+    deadline = time.monotonic() + cfg.get("NOTIFY_STREAM_MAX_SECONDS", 50)
+
+    def events():
+        nonlocal last_id
+        previous = None
+        last_sent = time.monotonic()
+        yield "retry: 2000\n\n"
+        gen = notifications.generation()
+        while True:
+            try:
+                # Straight from the database: the cache's TTL outlasts the
+                # recheck interval and only hears about this process's writes
+                summary = notifications.compute(user_id, is_manager)
+            finally:
+                # Do not hold a pooled connection while idle
+                db.session.remove()
+            event_id = notifications.fingerprint(summary)
+            if event_id != last_id:
+                parts = [
+                    ("tasks", {"pending_task_ids": summary.pending_task_ids}),
+                    ("approvals", {"count": summary.approvals}),
+                    ("messages", {"count": summary.messages}),
+                ]
+                for (name, data), old in zip(parts, previous or [None] * len(parts)):
+                    if data != old:
+                        yield _sse(name, data, event_id)
+                previous = [data for _, data in parts]
+                last_id = event_id
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= heartbeat:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            gen = notifications.wait_for_change(gen, timeout=min(recheck, remaining))
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs once when the server closes the response, even if the body was
+    # never iterated (client gone before the first chunk)
+    response.call_on_close(notifications.release_stream)
+    return response
 
 
 # Messaging (Owner <-> Worker)
 
 def _get_owner() -> User | None:
-    return User.query.filter_by(role="owner").first()
+    return identity.owner()
 
 
 @main_bp.route("/messages")
 @login_required
 def messages_root():
     if _is_manager():
-        # Prefer the most recent unread conversation, if any
-        try:
-            recent_unread = (
-                Message.query.filter_by(receiver_id=current_user.id, read_at=None)
-                .order_by(Message.created_at.desc())
-                .first()
+        return redirect(url_for("main.inbox"))
+    owner = _get_owner()
+    if not owner:
+        flash("Owner account not found")
+        return redirect(url_for("main.tasks"))
+    return redirect(url_for("main.messages_with", user_id=owner.id))
+
+
+# Characters of the last message shown in the inbox
+PREVIEW_CHARS = 120
+
+
+class Conversation(NamedTuple):
+    user_id: int
+    username: str
+    unread: int
+    last_body: str | None
+    last_at: datetime | None
+    last_from_me: bool
+
+
+def _inbox_statement(user_id: int):
+    """One row per worker: unread count and the last message each way.
+
+    Each value is a correlated subquery that one index probe answers, so the
+    cost grows with the number of workers, not with the message history.
+    """
+    partner = User.id
+
+    def last_id(sender_id, receiver_id):
+        return (
+            select(Message.id)
+            .where(Message.sender_id == sender_id, Message.receiver_id == receiver_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+            .correlate(User)
+            .scalar_subquery()
+        )
+
+    unread = (
+        select(func.count())
+        .select_from(Message)
+        .where(
+            Message.receiver_id == user_id,
+            Message.sender_id == partner,
+            Message.read_at.is_(None),
+        )
+        .correlate(User)
+        .scalar_subquery()
+    )
+    incoming = aliased(Message)
+    outgoing = aliased(Message)
+    return (
+        select(
+            User.id,
+            User.username,
+            unread,
+            incoming.id,
+            func.substr(incoming.body, 1, PREVIEW_CHARS),
+            incoming.created_at,
+            outgoing.id,
+            func.substr(outgoing.body, 1, PREVIEW_CHARS),
+            outgoing.created_at,
+        )
+        .select_from(User)
+        .outerjoin(incoming, incoming.id == last_id(partner, user_id))
+        .outerjoin(outgoing, outgoing.id == last_id(user_id, partner))
+        .where(User.role == "worker")
+    )
+
+
+def _conversations(user_id: int) -> list:
+    conversations = []
+    rows = db.session.execute(_inbox_statement(user_id))
+    for uid, username, unread, in_id, in_body, in_at, out_id, out_body, out_at in rows:
+        from_me = out_id is not None and (in_id is None or (out_at, out_id) > (in_at, in_id))
+        conversations.append(
+            Conversation(
+                uid,
+                username,
+                unread,
+                out_body if from_me else in_body,
+                out_at if from_me else in_at,
+                from_me,
             )
-            if recent_unread:
-                u = User.query.get(recent_unread.sender_id)
-                if u and u.role == "worker":
-                    return redirect(url_for("main.messages_with", user_id=u.id))
-        except Exception:
-            pass
+        )
+    # Unread first, then the most recently active
+    conversations.sort(key=lambda c: c.username)
+    conversations.sort(key=lambda c: c.last_at or datetime.min, reverse=True)
+    conversations.sort(key=lambda c: c.unread == 0)
+    return conversations
 
-        user = User.query.filter(User.role == "worker").order_by(User.username.asc()).first()
-        if not user:
-            flash("No workers yet. The owner can create one from the Users page.")
-            return redirect(url_for("main.tasks"))
-        return redirect(url_for("main.messages_with", user_id=user.id))
-    else:
-        owner = _get_owner()
-        if not owner:
-            flash("Owner account not found")
-            return redirect(url_for("main.tasks"))
-        return redirect(url_for("main.messages_with", user_id=owner.id))
 
+@main_bp.route("/messages/inbox")
+@login_required
+def inbox():
+    if not _is_manager():
+        return redirect(url_for("main.messages_root"))
+    conversations = _conversations(current_user.id)
+    if not conversations:
+        flash("No workers yet. The owner can create one from the Users page.")
+        return redirect(url_for("main.tasks"))
+    return render_template("inbox.html", conversations=conversations)
 
-@main_bp.route("/messages/<int:user_id>", methods=["GET", "POST"])
+
+BROADCAST_TARGETS = ("all", "open_tasks", "selected")
+
+
+def _broadcast_recipients(target: str, selected_ids) -> list:
+    """Ids of the workers a broadcast to ``target`` reaches."""
+    query = select(User.id).where(User.role == "worker")
+    if target == "open_tasks":
+        query = query.where(
+            exists().where(Task.assignee_id == User.id, Task.status != "done")
+        )
+    elif target == "selected":
+        query = query.where(User.id.in_(selected_ids))
+    return db.session.execute(query.order_by(User.id)).scalars().all()
+
+
+@main_bp.route("/messages/broadcast", methods=["GET", "POST"])
 @login_required
-def messages_with(user_id: int):
-    other = User.query.get_or_404(user_id)
+def broadcast():
+    if not _is_manager():
+        flash("Only managers can broadcast messages")
+        return redirect(url_for("main.messages_root"))
+
+    if request.method == "POST":
+        body = (request.form.get("body") or "").strip()
+        target = request.form.get("target", "all")
+        selected_ids = [int(v) for v in request.form.getlist("worker_ids") if v.isdigit()]
+        if not body:
+            flash("Message cannot be empty")
+        elif target not in BROADCAST_TARGETS:
+            flash("Choose who should receive the message")
+        else:
+            recipients = _broadcast_recipients(target, selected_ids)
+            if not recipients:
+                flash("No workers match; nothing was sent")
+            else:
+                now = datetime.utcnow()
+                # One multi-row INSERT; only the recipients' badges change
+                db.session.execute(
+                    insert(Message).execution_options(notify_users=recipients),
+                    [
+                        {"sender_id": current_user.id, "receiver_id": rid, "body": body, "created_at": now}
+                        for rid in recipients
+                    ],
+                )
+                db.session.commit()
+                flash(f"Message sent to {len(recipients)} worker(s)")
+                return redirect(url_for("main.inbox"))
+
+    workers = User.query.filter(User.role == "worker").order_by(User.username.asc()).all()
+    return render_template("broadcast.html", workers=workers, targets=BROADCAST_TARGETS)
+
+
+# Conversation pages: newest first, with the id as a tiebreak for messages
+# sent within the same timestamp
+THREAD_ORDER = [
+    pagination.SortKey(Message.created_at, lambda m: m.created_at, desc=True),
+    pagination.SortKey(Message.id, lambda m: m.id, desc=True),
+]
+
+# Most new messages returned by one /since request
+MAX_SINCE_MESSAGES = 200
+
 
-    # Permissions: workers may only talk with owner; owner may message any worker
+def _conversation_error(other: User) -> str | None:
+    """Why the current user may not talk with ``other``, or None if they may."""
+    # Workers may only talk with owner; owner may message any worker
     if _is_manager():
         if other.role != "worker":
-            flash("Managers can only open conversations with workers")
-            return redirect(url_for("main.messages_root"))
+            return "Managers can only open conversations with workers"
     else:
         owner = _get_owner()
         if other.id != (owner.id if owner else -1):
-            flash("Workers can only message the owner")
-            return redirect(url_for("main.messages_root"))
+            return "Workers can only message the owner"
+    return None
+
+
+def _thread_query(other_id: int):
+    return Message.query.filter(
+        ((Message.sender_id == current_user.id) & (Message.receiver_id == other_id))
+        | ((Message.sender_id == other_id) & (Message.receiver_id == current_user.id))
+    ).options(joinedload(Message.sender))
+
+
+def _mark_thread_read(other: User) -> None:
+    """Mark messages from ``other`` as read and send a receipt if a worker read them."""
+    now = datetime.utcnow()
+    # One UPDATE; RETURNING gives both how many were unread and the newest
+    read = db.session.execute(
+        update(Message)
+        .where(
+            Message.receiver_id == current_user.id,
+            Message.sender_id == other.id,
+            Message.read_at.is_(None),
+        )
+        .values(read_at=now)
+        .returning(Message.created_at)
+        .execution_options(synchronize_session=False, notify_users=(current_user.id,))
+    ).scalars().all()
+    if not read:
+        return
+    # If a worker just read owner's messages, inform the owner
+    if current_user.role == "worker" and other.role in {"owner", "admin"}:
+        body = f"I have read your message(s). Latest at {max(read).strftime('%Y-%m-%d %H:%M')}."
+        db.session.add(Message(sender_id=current_user.id, receiver_id=other.id, body=body))
+    db.session.commit()
+
+
+@main_bp.route("/messages/<int:user_id>", methods=["GET", "POST"])
+@login_required
+def messages_with(user_id: int):
+    other = User.query.get_or_404(user_id)
+    error = _conversation_error(other)
+    if error:
+        flash(error)
+        return redirect(url_for("main.messages_root"))
 
     if request.method == "POST":
         body = (request.form.get("body") or "").strip()
@@ -682,33 +867,29 @@ def messages_with(user_id: int):
             db.session.commit()
             return redirect(url_for("main.messages_with", user_id=other.id))
 
-    # Load thread
-    thread = (
-        Message.query.filter(
-            ((Message.sender_id == current_user.id) & (Message.receiver_id == other.id))
-            | ((Message.sender_id == other.id) & (Message.receiver_id == current_user.id))
+    # Mark read before loading the page, so the commit does not expire it
+    _mark_thread_read(other)
+
+    cursor = request.args.get("cursor", "").strip() or None
+    try:
+        page = pagination.paginate(
+            _thread_query(other.id),
+            THREAD_ORDER,
+            cursor,
+            current_app.config.get("MESSAGES_PAGE_SIZE", 50),
         )
-        .order_by(Message.created_at.asc())
-        .all()
+    except pagination.InvalidCursor:
+        return redirect(url_for("main.messages_with", user_id=other.id))
+    # Pages come newest first; the chat reads top to bottom
+    thread = page.items[::-1]
+    older_url = (
+        url_for("main.messages_with", user_id=other.id, cursor=page.next_cursor)
+        if page.next_cursor
+        else None
     )
-
-    # Mark incoming as read and optionally notify sender (read receipt)
-    unread_incoming = [m for m in thread if m.receiver_id == current_user.id and m.read_at is None]
-    if unread_incoming:
-        now = datetime.utcnow()
-        for m in unread_incoming:
-            m.read_at = now
-        # If a worker just read owner's messages, inform the owner
-        try:
-            if current_user.role == "worker" and other.role in {"owner", "admin"}:
-                last_ts = max((m.created_at for m in unread_incoming), default=now)
-                body = f"I have read your message(s). Latest at {last_ts.strftime('%Y-%m-%d %H:%M')}."
-                db.session.add(Message(sender_id=current_user.id, receiver_id=other.id, body=body))
-        except Exception:
-            pass
-        db.session.commit()
-    else:
-        db.session.commit()
+    newest_url = url_for("main.messages_with", user_id=other.id) if cursor else None
+    # Only the newest page follows new messages live
+    since_url = None if cursor else url_for("main.messages_since", user_id=other.id)
 
     # Owner list of workers for quick switching
     workers = []
@@ -719,11 +900,59 @@ def messages_with(user_id: int):
     if _is_manager():
         pending_reqs = (
             TaskCompletionRequest.query.filter_by(status="pending", requested_by_id=other.id)
+            .options(joinedload(TaskCompletionRequest.task))
             .order_by(TaskCompletionRequest.created_at.asc())
             .all()
         )
 
-    return render_template("messages.html", other=other, thread=thread, workers=workers, pending_reqs=pending_reqs)
+    return render_template(
+        "messages.html",
+        other=other,
+        thread=thread,
+        workers=workers,
+        pending_reqs=pending_reqs,
+        older_url=older_url,
+        newest_url=newest_url,
+        since_url=since_url,
+        last_id=max((m.id for m in thread), default=0),
+    )
+
+
+@main_bp.route("/messages/<int:user_id>/since")
+@login_required
+def messages_since(user_id: int):
+    """Messages in the conversation with ids above ``after``, oldest first.
+
+    An open chat polls this instead of reloading the page; each item carries
+    its rendered HTML so the client can append it as is.
+    """
+    other = User.query.get_or_404(user_id)
+    if _conversation_error(other):
+        return jsonify(error="forbidden"), 403
+    after_id = request.args.get("after", type=int)
+    if after_id is None:
+        return jsonify(error="after is required"), 400
+
+    _mark_thread_read(other)
+    rows = (
+        _thread_query(other.id)
+        .filter(Message.id > after_id)
+        .order_by(Message.id.asc())
+        .limit(MAX_SINCE_MESSAGES + 1)
+        .all()
+    )
+    more = len(rows) > MAX_SINCE_MESSAGES
+    rows = rows[:MAX_SINCE_MESSAGES]
+    items = [
+        {
+            "id": m.id,
+            "sender_id": m.sender_id,
+            "created_at": m.created_at.isoformat(timespec="seconds"),
+            "html": render_template("_message.html", m=m),
+        }
+        for m in rows
+    ]
+    return jsonify(items=items, last_id=rows[-1].id if rows else after_id, more=more)
 
 
 @main_bp.route("/users/<int:user_id>/delete", methods=["POST"])
@@ -849,7 +1078,7 @@ def request_complete(task_id: int):
     db.session.add(req)
 
     # Send default message to owner notifying the request
-    owner = User.query.filter_by(role="owner").first()
+    owner = _get_owner()
     if owner:
         msg_body = (
             f"Request to mark task #{task.id} '{task.title}' as done."
@@ -872,6 +1101,10 @@ def approvals():
         return redirect(url_for("main.tasks"))
     pending = (
         TaskCompletionRequest.query.filter_by(status="pending")
+        .options(
+            joinedload(TaskCompletionRequest.task),
+            joinedload(TaskCompletionRequest.requested_by),
+        )
         .order_by(TaskCompletionRequest.created_at.asc())
         .all()
     )
@@ -879,39 +1112,77 @@ def approvals():
 
 
 # Owner decision endpoints
+def _decide(request_ids, approve: bool, note: str):
+    """Approve or reject the pending requests among ``request_ids``.
+
+    Set-based: one UPDATE for the requests, one for their tasks and one
+    multi-row INSERT for the requesters' notifications, all committed
+    together. Returns the number of requests decided and of tasks marked done.
+    """
+    now = datetime.utcnow()
+    decided = db.session.execute(
+        update(TaskCompletionRequest)
+        .where(
+            TaskCompletionRequest.id.in_(request_ids),
+            TaskCompletionRequest.status == "pending",
+        )
+        .values(
+            status="approved" if approve else "rejected",
+            decision_by_id=current_user.id,
+            decision_note=note,
+            decision_at=now,
+        )
+        .returning(TaskCompletionRequest.task_id, TaskCompletionRequest.requested_by_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not decided:
+        return 0, 0
+
+    titles = {}
+    if approve:
+        # updated_at is set explicitly: it drives the task list's ETag
+        titles = dict(
+            db.session.execute(
+                update(Task)
+                .where(Task.id.in_({task_id for task_id, _ in decided}))
+                .values(status="done", updated_at=now)
+                .returning(Task.id, Task.title)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+
+    note_txt = f" Note: {note}" if note else ""
+    notices = []
+    for task_id, requested_by_id in decided:
+        if not requested_by_id or requested_by_id == current_user.id:
+            continue
+        if approve:
+            if task_id not in titles:
+                continue
+            body = f"Your request to mark task #{task_id} '{titles[task_id]}' as done was approved.{note_txt}"
+        else:
+            body = f"Your request to mark task #{task_id} was rejected.{note_txt}"
+        notices.append(
+            {"sender_id": current_user.id, "receiver_id": requested_by_id, "body": body, "created_at": now}
+        )
+    if notices:
+        db.session.execute(
+            insert(Message).execution_options(notify_users={n["receiver_id"] for n in notices}),
+            notices,
+        )
+    db.session.commit()
+    return len(decided), len(titles)
+
+
 @main_bp.route("/approvals/<int:req_id>/approve", methods=["POST"])
 @login_required
 def approvals_approve(req_id: int):
     if not _is_manager():
         flash("Only managers can approve")
         return redirect(url_for("main.tasks"))
-    req = TaskCompletionRequest.query.get_or_404(req_id)
-    if req.status != "pending":
-        return redirect(url_for("main.approvals"))
-    req.status = "approved"
-    req.decision_by_id = current_user.id
-    req.decision_note = (request.form.get("decision_note") or "").strip()
-    req.decision_at = datetime.utcnow()
-
-    # Apply status change
-    task = Task.query.get(req.task_id)
-    if task:
-        task.status = "done"
-        # Notify requester
-        try:
-            if req.requested_by_id and req.requested_by_id != current_user.id:
-                note_txt = f" Note: {req.decision_note}" if req.decision_note else ""
-                db.session.add(
-                    Message(
-                        sender_id=current_user.id,
-                        receiver_id=req.requested_by_id,
-                        body=f"Your request to mark task #{task.id} '{task.title}' as done was approved.{note_txt}",
-                    )
-                )
-        except Exception:
-            pass
-    db.session.commit()
-    flash("Request approved; task marked done")
+    TaskCompletionRequest.query.get_or_404(req_id)
+    if _decide([req_id], True, (request.form.get("decision_note") or "").strip())[0]:
+        flash("Request approved; task marked done")
     return redirect(url_for("main.approvals"))
 
 
@@ -921,27 +1192,33 @@ def approvals_reject(req_id: int):
     if not _is_manager():
         flash("Only managers can reject")
         return redirect(url_for("main.tasks"))
-    req = TaskCompletionRequest.query.get_or_404(req_id)
-    if req.status != "pending":
+    TaskCompletionRequest.query.get_or_404(req_id)
+    if _decide([req_id], False, (request.form.get("decision_note") or "").strip())[0]:
+        flash("Request rejected")
+    return redirect(url_for("main.approvals"))
+
+
+@main_bp.route("/approvals/bulk", methods=["POST"])
+@login_required
+def approvals_bulk():
+    if not _is_manager():
+        flash("Only managers can approve")
+        return redirect(url_for("main.tasks"))
+    action = request.form.get("action")
+    request_ids = {int(v) for v in request.form.getlist("request_ids") if v.isdigit()}
+    if action not in {"approve", "reject"} or not request_ids:
+        flash("Select at least one request")
         return redirect(url_for("main.approvals"))
-    req.status = "rejected"
-    req.decision_by_id = current_user.id
-    req.decision_note = (request.form.get("decision_note") or "").strip()
-    req.decision_at = datetime.utcnow()
-    # Notify requester
-    try:
-        task = Task.query.get(req.task_id)
-        if req.requested_by_id and req.requested_by_id != current_user.id:
-            note_txt = f" Note: {req.decision_note}" if req.decision_note else ""
-            db.session.add(
-                Message(
-                    sender_id=current_user.id,
-                    receiver_id=req.requested_by_id,
-                    body=f"Your request to mark task #{task.id if task else req.task_id} was rejected.{note_txt}",
-                )
-            )
-    except Exception:
-        pass
-    db.session.commit()
-    flash("Request rejected")
+
+    approve = action == "approve"
+    decided, done = _decide(request_ids, approve, (request.form.get("decision_note") or "").strip())
+    if approve:
+        summary = f"Approved {decided} request(s); {done} task(s) marked done"
+    else:
+        summary = f"Rejected {decided} request(s)"
+    # Ids that matched no pending request: decided meanwhile, or unknown
+    skipped = len(request_ids) - decided
+    if skipped:
+        summary += f"; {skipped} not found or already decided"
+    flash(summary)
     return redirect(url_for("main.approvals"))
@@ -0,0 +1,86 @@
+"""Full-text task search behind the task list's ``q`` parameter.
+
+``ILIKE '%q%'`` cannot use an index, so every search read the whole task
+table including descriptions. Postgres instead keeps a generated ``tsvector``
+column (``task.search_vector``, GIN indexed) and SQLite an FTS5 table
+(``task_fts``) kept in sync by triggers; both are created by migration 6 and
+are deliberately not mapped on the model. Every word of the query must match
+the start of a word in the title or description, and title matches rank
+higher. Backends without either fall back to ILIKE.
+"""
+import re
+import weakref
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import Float, cast, column, func, inspect, literal_column, or_, select, table
+
+from .models import Task
+
+
+class Match(NamedTuple):
+    query: Any
+    # Higher is better; None when the backend has no full-text support
+    rank: Any
+
+
+# Words as the backends tokenize them: letters and digits in any script
+_WORD = re.compile(r"[^\W_]+")
+
+# "simple" config: no stemming or stop words, which suits mixed
+# English/Arabic data and keeps prefix matching predictable
+PG_CONFIG = "simple"
+
+# Postgres' default ts_rank weights are 1.0 for A (title) and 0.4 for B
+# (description); give bm25 the same ratio
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+_task_fts = table("task_fts", column("rowid"))
+_backends = weakref.WeakKeyDictionary()
+
+
+def terms(q: str) -> list:
+    return _WORD.findall(q.lower())
+
+
+def backend(engine) -> Optional[str]:
+    """'postgresql' or 'sqlite' when the search index exists, else None."""
+    if engine not in _backends:
+        name = engine.dialect.name
+        if name == "postgresql":
+            found = name
+        elif name == "sqlite":
+            with engine.connect() as conn:
+                found = name if inspect(conn).has_table("task_fts") else None
+        else:
+            found = None
+        _backends[engine] = found
+    return _backends[engine]
+
+
+def apply(query, q: str, engine) -> Match:
+    """Restrict ``query`` (over Task) to tasks matching ``q``."""
+    words = terms(q)
+    kind = backend(engine) if words else None
+    if kind == "postgresql":
+        tsquery = func.to_tsquery(PG_CONFIG, " & ".join(f"{w}:*" for w in words))
+        vector = literal_column("task.search_vector")
+        # ts_rank returns real; as double precision the value survives a
+        # round trip through a cursor and compares equal on the next page
+        rank = cast(func.ts_rank(vector, tsquery), Float)
+        return Match(query.filter(vector.op("@@")(tsquery)), rank)
+    if kind == "sqlite":
+        fts = literal_column("task_fts")
+        hits = (
+            select(
+                _task_fts.c.rowid.label("task_id"),
+                # bm25 is lower-is-better; negate to match ts_rank
+                (-func.bm25(fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT, type_=Float)).label("rank"),
+            )
+            .where(fts.op("MATCH")(" ".join(f'"{w}"*' for w in words)))
+            .subquery()
+        )
+        return Match(query.join(hits, hits.c.task_id == Task.id), hits.c.rank)
+
+    like = f"%{q}%"
+    return Match(query.filter(or_(Task.title.ilike(like), Task.description.ilike(like))), None)
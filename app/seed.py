@@ -0,0 +1,175 @@
+"""Synthetic data for load tests and benchmarks: ``flask --app run seed``.
+
+Rows are written with multi-row INSERTs in batches, so millions of tasks
+and messages can be generated in minutes. Everything is derived from
+``--seed``, so two runs with the same options produce the same data.
+"""
+import random
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from .models import Message, Task, TaskCompletionRequest, User, db
+
+
+WORDS = (
+    "invoice stock order delivery shelf inventory supplier receipt refund "
+    "display window cleaning counter price label discount payroll schedule "
+    "shift report audit repair fridge freezer lighting sign banner customer "
+    "return warranty catalogue pallet forklift storage backroom register cash"
+).split()
+
+STATUSES = ("todo", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high")
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _batches(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(model, rows, batch_size: int, label: str, echo) -> None:
+    written = 0
+    for batch in _batches(rows, batch_size):
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        written += len(batch)
+        echo(f"  {label}: {written}")
+
+
+def seed(
+    workers: int = 50,
+    tasks: int = 10_000,
+    messages: int = 50_000,
+    pending: int = 500,
+    password: str = "password",
+    batch_size: int = 5000,
+    rng_seed: int = 42,
+    echo=lambda line: None,
+) -> dict:
+    """Add an owner (if missing), ``workers`` workers and their data.
+
+    Workers are named worker0001, worker0002, ... (continuing after any
+    already present); all seeded accounts share ``password``.
+    """
+    rng = random.Random(rng_seed)
+    # One hash for every seeded account; hashing is deliberately slow
+    password_hash = generate_password_hash(password)
+    now = datetime.utcnow()
+
+    owner_id = db.session.execute(
+        select(User.id).where(User.role == "owner").order_by(User.id).limit(1)
+    ).scalar()
+    if owner_id is None:
+        owner = User(username="owner", role="owner", password_hash=password_hash)
+        db.session.add(owner)
+        db.session.commit()
+        owner_id = owner.id
+
+    start = db.session.execute(select(func.count(User.id)).where(User.role == "worker")).scalar()
+    _insert(
+        User,
+        (
+            {"username": f"worker{start + i + 1:04d}", "role": "worker", "password_hash": password_hash}
+            for i in range(workers)
+        ),
+        batch_size,
+        "users",
+        echo,
+    )
+    worker_ids = db.session.execute(select(User.id).where(User.role == "worker")).scalars().all()
+    if not worker_ids:
+        raise click.ClickException("No workers to assign tasks to")
+
+    first_task = (db.session.execute(select(func.max(Task.id))).scalar() or 0) + 1
+
+    def task_rows():
+        for _ in range(tasks):
+            created = now - timedelta(minutes=rng.randrange(0, 525_600))
+            yield {
+                "title": _sentence(rng, rng.randint(2, 6)),
+                "description": _sentence(rng, rng.randint(0, 30)) or None,
+                "status": rng.choices(STATUSES, weights=(5, 2, 3))[0],
+                "priority": rng.choice(PRIORITIES),
+                # About a third have no due date
+                "due_date": (
+                    (created + timedelta(days=rng.randint(1, 60))).date()
+                    if rng.random() < 0.66
+                    else None
+                ),
+                "assignee_id": rng.choice(worker_ids),
+                "created_by_id": owner_id,
+                "created_at": created,
+                "updated_at": created + timedelta(minutes=rng.randrange(0, 10_000)),
+            }
+
+    _insert(Task, task_rows(), batch_size, "tasks", echo)
+    last_task = db.session.execute(select(func.max(Task.id))).scalar() or 0
+
+    def message_rows():
+        for _ in range(messages):
+            worker_id = rng.choice(worker_ids)
+            to_owner = rng.random() < 0.5
+            created = now - timedelta(minutes=rng.randrange(0, 525_600))
+            yield {
+                "sender_id": worker_id if to_owner else owner_id,
+                "receiver_id": owner_id if to_owner else worker_id,
+                "body": _sentence(rng, rng.randint(1, 20)),
+                "created_at": created,
+                # Most of the history has been read
+                "read_at": None if rng.random() < 0.02 else created + timedelta(minutes=5),
+            }
+
+    _insert(Message, message_rows(), batch_size, "messages", echo)
+
+    def request_rows():
+        if last_task < first_task:
+            return
+        for _ in range(pending):
+            yield {
+                "task_id": rng.randint(first_task, last_task),
+                "requested_by_id": rng.choice(worker_ids),
+                "note": _sentence(rng, rng.randint(0, 8)) or None,
+                "status": "pending",
+                "created_at": now - timedelta(minutes=rng.randrange(0, 10_000)),
+            }
+
+    _insert(TaskCompletionRequest, request_rows(), batch_size, "pending approvals", echo)
+    return {"owner_id": owner_id, "workers": len(worker_ids)}
+
+
+@click.command("seed")
+@click.option("--workers", default=50, show_default=True)
+@click.option("--tasks", default=1_000_000, show_default=True)
+@click.option("--messages", default=5_000_000, show_default=True)
+@click.option("--pending", default=10_000, show_default=True, help="Pending completion requests.")
+@click.option("--password", default="password", show_default=True, help="For every seeded account.")
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option("--seed", "rng_seed", default=42, show_default=True, help="Random seed.")
+@with_appcontext
+def seed_command(workers, tasks, messages, pending, password, batch_size, rng_seed):
+    """Fill the database with synthetic users, tasks, messages and approvals."""
+    result = seed(
+        workers=workers,
+        tasks=tasks,
+        messages=messages,
+        pending=pending,
+        password=password,
+        batch_size=batch_size,
+        rng_seed=rng_seed,
+        echo=click.echo,
+    )
+    click.echo(f"Seeded; owner id {result['owner_id']}, {result['workers']} workers in total")
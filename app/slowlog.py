@@ -0,0 +1,167 @@
+"""Opt-in slow-query log.
+
+With SLOW_QUERY_MS set, every statement that takes longer is kept in a
+bounded in-memory ring buffer (SLOW_QUERY_LOG_SIZE entries per process)
+with the endpoint that issued it and its bind parameters. The owner can
+read the buffer at ``/slow-queries``. The query plan is fetched the first
+time that page shows an entry, with plain EXPLAIN (the statement is not
+executed) on a separate connection. Nothing is captured inside the slow
+request itself.
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    has_request_context,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from flask_login import current_user, login_required
+from sqlalchemy import event
+
+from .models import db
+
+
+slowlog_bp = Blueprint("slowlog", __name__)
+
+# Longest bind parameter value kept, in characters
+MAX_PARAM_CHARS = 200
+
+_lock = threading.Lock()
+_entries = deque(maxlen=100)
+
+
+class SlowQuery:
+    __slots__ = ("at", "seconds", "endpoint", "statement", "parameters", "executemany", "plan")
+
+    def __init__(self, seconds, endpoint, statement, parameters, executemany):
+        self.at = datetime.utcnow()
+        self.seconds = seconds
+        self.endpoint = endpoint
+        self.statement = statement
+        self.parameters = parameters
+        self.executemany = executemany
+        self.plan: Optional[str] = None
+
+
+def _scrub(value):
+    if isinstance(value, str) and len(value) > MAX_PARAM_CHARS:
+        return value[:MAX_PARAM_CHARS] + "…"
+    return value
+
+
+def _clean_parameters(parameters, executemany: bool):
+    if executemany:
+        # Bulk inserts: the first row shows the shape, the count the size
+        rows = list(parameters or [])
+        return {"rows": len(rows), "first": _clean_parameters(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {
+            k: "***" if "password" in str(k).lower() else _scrub(v)
+            for k, v in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        return tuple(_scrub(v) for v in parameters)
+    return parameters
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["slowlog_started"] = time.perf_counter()
+
+
+def _record(seconds, statement, parameters, executemany) -> None:
+    if statement.lstrip().upper().startswith("EXPLAIN"):
+        return
+    if has_request_context():
+        endpoint = request.url_rule.endpoint if request.url_rule else request.path
+    else:
+        endpoint = "(background)"
+    entry = SlowQuery(
+        seconds,
+        endpoint,
+        statement,
+        _clean_parameters(parameters, executemany),
+        executemany,
+    )
+    with _lock:
+        _entries.append(entry)
+
+
+def init_slowlog(app) -> None:
+    global _entries
+    app.register_blueprint(slowlog_bp)
+    threshold = app.config.get("SLOW_QUERY_MS", 0) / 1000
+    if threshold <= 0:
+        return
+    with _lock:
+        _entries = deque(_entries, maxlen=app.config.get("SLOW_QUERY_LOG_SIZE", 100))
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("slowlog_started", None)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            if seconds >= threshold:
+                _record(seconds, statement, parameters, executemany)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+
+
+def _explain(entry: SlowQuery) -> str:
+    """Plan for ``entry`` from a separate connection; the statement does not run."""
+    if entry.executemany:
+        return "(not available for executemany statements)"
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        prefix = "EXPLAIN (ANALYZE off) "
+    elif dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return f"(EXPLAIN not supported for {dialect})"
+    try:
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql(prefix + entry.statement, entry.parameters or ()).all()
+    except Exception as e:
+        return f"(EXPLAIN failed: {type(e).__name__}: {e})"
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+@slowlog_bp.route("/slow-queries")
+@login_required
+def slow_queries():
+    if not current_user.is_owner():
+        flash("Only the owner can view slow queries")
+        return redirect(url_for("main.tasks"))
+    with _lock:
+        entries = list(reversed(_entries))
+    for entry in entries:
+        if entry.plan is None:
+            entry.plan = _explain(entry)
+    return render_template(
+        "slow_queries.html",
+        entries=entries,
+        threshold=current_app.config.get("SLOW_QUERY_MS", 0),
+    )
+
+
+@slowlog_bp.route("/slow-queries/clear", methods=["POST"])
+@login_required
+def clear_slow_queries():
+    if not current_user.is_owner():
+        flash("Only the owner can view slow queries")
+        return redirect(url_for("main.tasks"))
+    with _lock:
+        _entries.clear()
+    return redirect(url_for("slowlog.slow_queries"))
@@ -1,4 +1,4 @@
-// Live notifications: poll server and update bell and approvals bubble
+// Live notifications: stream (or poll) server and update bell and approvals bubble
 (function(){
   const lastMKey = 'tm_last_msgs';
   const lastAKey = 'tm_last_appr';
@@ -73,27 +73,46 @@
     });
   }
 
+  function apply({messages, approvals, pending_task_ids}){
+    const lm = Number(localStorage.getItem(lastMKey)||'0');
+    const la = Number(localStorage.getItem(lastAKey)||'0');
+    const hasApprovalsLink = !!document.getElementById('approvals-link');
+    if (messages>lm || (hasApprovalsLink && approvals>la)) setTimeout(()=>beep(), 200);
+    localStorage.setItem(lastMKey, String(messages||0));
+    localStorage.setItem(lastAKey, String(approvals||0));
+    lastMessages = Number(messages||0);
+    lastApprovals = Number(approvals||0);
+    updateHeader(messages||0, approvals||0);
+    updateCards(pending_task_ids||[]);
+  }
+
   function poll(){
     fetch('/notifications/poll', {credentials:'same-origin'})
       .then(r=> r.ok ? r.json() : Promise.reject())
-      .then(({messages, approvals, pending_task_ids})=>{
-        const lm = Number(localStorage.getItem(lastMKey)||'0');
-        const la = Number(localStorage.getItem(lastAKey)||'0');
-        const hasApprovalsLink = !!document.getElementById('approvals-link');
-        if (messages>lm || (hasApprovalsLink && approvals>la)) setTimeout(()=>beep(), 200);
-        localStorage.setItem(lastMKey, String(messages||0));
-        localStorage.setItem(lastAKey, String(approvals||0));
-        lastMessages = Number(messages||0);
-        lastApprovals = Number(approvals||0);
-        updateHeader(messages||0, approvals||0);
-        updateCards(pending_task_ids||[]);
-      })
+      .then(apply)
       .catch(()=>{});
   }
 
-  // Initial refresh then poll every 7s
+  let pollTimer = null;
+  function startPolling(){
+    if (pollTimer) return;
+    setTimeout(poll, 500);
+    pollTimer = setInterval(poll, 7000);
+  }
+
+  // Prefer the server push stream; it sends only the parts that changed.
+  // The server answers 204 (EventSource closes) when streaming is off or busy.
+  function startStream(){
+    if (typeof window.EventSource === 'undefined') return startPolling();
+    const state = {messages: lastMessages, approvals: lastApprovals, pending_task_ids: []};
+    let es;
+    try { es = new EventSource('/notifications/stream'); } catch (e) { return startPolling(); }
+    es.addEventListener('messages', (e)=>{ state.messages = JSON.parse(e.data).count; apply(state); });
+    es.addEventListener('approvals', (e)=>{ state.approvals = JSON.parse(e.data).count; apply(state); });
+    es.addEventListener('tasks', (e)=>{ state.pending_task_ids = JSON.parse(e.data).pending_task_ids; apply(state); });
+    es.onerror = ()=>{ if (es.readyState === 2) { es.close(); startPolling(); } };
+  }
+
   initCardBubbles();
-  setTimeout(poll, 500);
-  setInterval(poll, 7000);
+  startStream();
 })();
-
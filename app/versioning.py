@@ -0,0 +1,76 @@
+"""Cheap per-user data versions for conditional GET (ETag / 304).
+
+A page can be answered with ``304 Not Modified`` when nothing it shows has
+changed. Rather than rendering and hashing the page, hash a handful of
+aggregates (row counts and the newest timestamps/ids) over the rows the user
+can see; any insert, update or delete moves at least one of them.
+"""
+import hashlib
+
+from flask import Response, request, session
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from .i18n import get_locale
+from .models import Message, Task, TaskCompletionRequest, User, db
+
+
+def data_version(user) -> tuple:
+    """One-statement fingerprint of the task, approval and badge data for ``user``."""
+    task_scope = []
+    pending_scope = [TaskCompletionRequest.status == "pending"]
+    if not user.is_manager():
+        task_scope.append(Task.assignee_id == user.id)
+        pending_scope.append(TaskCompletionRequest.requested_by_id == user.id)
+    unread_scope = [Message.receiver_id == user.id, Message.read_at.is_(None)]
+
+    aggregates = [
+        (func.count(Task.id), task_scope),
+        (func.max(Task.updated_at), task_scope),
+        (func.count(TaskCompletionRequest.id), pending_scope),
+        (func.max(TaskCompletionRequest.id), pending_scope),
+        (func.count(Message.id), unread_scope),
+        (func.max(Message.id), unread_scope),
+        (func.count(User.id), []),
+        (func.max(User.id), []),
+    ]
+    stmt = select(*[select(agg).where(*scope).scalar_subquery() for agg, scope in aggregates])
+    return tuple(db.session.execute(stmt).one())
+
+
+def etag_for(name: str, *parts):
+    """Strong ETag for ``name`` rendered for the current user/request, or None.
+
+    Returns None while flashed messages are queued: those are consumed by the
+    next render, so the response must not be replaced by a cached copy.
+    """
+    if session.get("_flashes"):
+        return None
+    raw = "|".join(
+        str(p)
+        for p in (
+            name,
+            current_user.get_id(),
+            getattr(current_user, "role", ""),
+            get_locale(),
+            request.query_string.decode("latin1"),
+            *parts,
+        )
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def not_modified(etag):
+    """A bodyless 304 if the client already holds ``etag``, else None."""
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    if etag and request.if_none_match.contains_weak(etag):
+        return tag(Response(status=304), etag)
+    return None
+
+
+def tag(response, etag):
+    if etag:
+        response.set_etag(etag)
+        # Always revalidate; the data behind the tag changes without notice
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,11 +1,70 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 # Load .env from project root for local development
 _ROOT = os.path.dirname(__file__)
 load_dotenv(os.path.join(_ROOT, ".env"), override=False)
 
 
+def _behind_pooler(database_url: str) -> bool:
+    """Whether connections go through a transaction-mode pooler.
+
+    Those (PgBouncer, Neon's "-pooler" hosts) reject startup options and hand
+    each transaction to any server connection, so session settings do not
+    stick either.
+    """
+    return os.environ.get("DB_POOLER", "").lower() in {"1", "true", "yes"} or (
+        "-pooler." in database_url
+    )
+
+
+def _statement_timeout_ms() -> int:
+    return int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+
+def _engine_options(database_url: str) -> dict:
+    """SQLAlchemy engine options for the DB_POOL_PROFILE deployment profile.
+
+    serverless: no pool; each invocation may be frozen or discarded, so
+        connections are not kept between requests (the default on Vercel).
+    gunicorn: one pool per worker process sized to its threads, so every
+        thread can hold a connection without waiting (see gunicorn.conf.py).
+    local: a small pool for the development server.
+    """
+    profile = os.environ.get("DB_POOL_PROFILE", "serverless" if os.environ.get("VERCEL") else "local")
+
+    connect_args = {"connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "10"))}
+    statement_timeout_ms = _statement_timeout_ms()
+    if statement_timeout_ms and not _behind_pooler(database_url):
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    # psycopg2 never uses server-side prepared statements, so nothing needs
+    # disabling for transaction-mode poolers (psycopg 3 would need
+    # prepare_threshold=None here)
+
+    if database_url.startswith("sqlite"):
+        # Benchmark mode only (see Config); pool defaults suit SQLite
+        return {}
+
+    options = {"connect_args": connect_args}
+    if profile == "serverless":
+        options["poolclass"] = NullPool
+        return options
+
+    threads = int(os.environ.get("GUNICORN_THREADS", "8")) if profile == "gunicorn" else 5
+    options.update(
+        pool_size=int(os.environ.get("DB_POOL_SIZE", str(threads))),
+        # Headroom for background jobs and their progress writes
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "4")),
+        pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        # Poolers and managed Postgres close idle connections; recycle
+        # before they do and check liveness on checkout
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "300")),
+        pool_pre_ping=True,
+    )
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-change-me")
     DATABASE_URL = os.environ.get("DATABASE_URL", "").strip()
@@ -19,11 +78,77 @@ class Config:
         raise RuntimeError(
             "DATABASE_URL is required and must be a pooled Postgres URL (e.g., from Neon/Supabase)."
         )
+    # SQLite only when explicitly asked for, for local benchmarks and tests
+    # (see tests/conftest.py); it is never used as a fallback
+    SQLITE_BENCHMARK = os.environ.get("ALLOW_SQLITE_BENCHMARK", "").lower() in {"1", "true", "yes"}
     if not (
         DATABASE_URL.startswith("postgresql://")
         or DATABASE_URL.startswith("postgresql+psycopg2://")
+        or (SQLITE_BENCHMARK and DATABASE_URL.startswith("sqlite:///"))
     ):
         raise RuntimeError("DATABASE_URL must start with 'postgresql://'")
 
     SQLALCHEMY_DATABASE_URI = DATABASE_URL
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(DATABASE_URL)
+    # Statement timeout applied with SET LOCAL at the start of every
+    # transaction, for poolers where the connect option cannot carry it
+    # (see app._init_statement_timeout); 0 when not needed
+    DB_TRANSACTION_STATEMENT_TIMEOUT_MS = (
+        _statement_timeout_ms()
+        if _behind_pooler(DATABASE_URL) and not DATABASE_URL.startswith("sqlite")
+        else 0
+    )
+
+    # Rows per page for the task list and /api/tasks (capped at 200)
+    TASKS_PAGE_SIZE = int(os.environ.get("TASKS_PAGE_SIZE", "50"))
+
+    # Messages shown per page of a conversation; older ones load by cursor
+    MESSAGES_PAGE_SIZE = int(os.environ.get("MESSAGES_PAGE_SIZE", "50"))
+
+    # Seconds a per-user notification summary may be served from cache.
+    # Writes in the same process invalidate it immediately.
+    NOTIFY_CACHE_TTL = float(os.environ.get("NOTIFY_CACHE_TTL", "10"))
+
+    # Seconds a logged-in user's identity (id, username, role) may be served
+    # from cache instead of loaded per request. User changes in the same
+    # process invalidate it immediately.
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", "30"))
+
+    # Server-Sent Events for live notifications. Each open stream holds a
+    # server thread, so cap them per process; 0 disables streaming and the
+    # client falls back to polling. Serverless functions cannot hold
+    # streams open, so default to 0 there.
+    NOTIFY_STREAM_MAX_CLIENTS = int(
+        os.environ.get("NOTIFY_STREAM_MAX_CLIENTS", "0" if os.environ.get("VERCEL") else "4")
+    )
+    NOTIFY_STREAM_MAX_SECONDS = float(os.environ.get("NOTIFY_STREAM_MAX_SECONDS", "50"))
+    NOTIFY_STREAM_RECHECK = float(os.environ.get("NOTIFY_STREAM_RECHECK", "5"))
+    NOTIFY_STREAM_HEARTBEAT = float(os.environ.get("NOTIFY_STREAM_HEARTBEAT", "15"))
+
+    # Rows fetched per server-side cursor batch (and per streamed chunk) in CSV export
+    EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", "1000"))
+    # Rows per multi-row INSERT during CSV import
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+
+    # Per-request app/SQL timings in a Server-Timing response header
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "1").lower() not in {"0", "false", "no"}
+    # Bearer token for Prometheus scrapes of /metrics; without it only the
+    # owner's browser session can read them
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+    # Record statements slower than this many milliseconds for the owner's
+    # /slow-queries page (0 = off), keeping the newest SLOW_QUERY_LOG_SIZE
+    SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))
+    SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", "100"))
+
+    # Background import/export jobs (app.jobs). Threads per process; 0 disables
+    # them and the import page posts synchronously. Serverless functions are
+    # frozen after the response, so default to 0 there.
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "0" if os.environ.get("VERCEL") else "2"))
+    # Queued + running jobs allowed per process before submissions get 503
+    JOB_QUEUE_LIMIT = int(os.environ.get("JOB_QUEUE_LIMIT", "8"))
+    # Uploads and export files older than this are deleted
+    JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "86400"))
+    # Unfinished jobs with no start or progress for this long are marked failed
+    JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "600"))
@@ -0,0 +1,10 @@
+# Gunicorn settings; the database pool in config.py (DB_POOL_PROFILE=gunicorn)
+# is sized from the same GUNICORN_THREADS value, one pool per worker process.
+# Peak Postgres connections: workers * (GUNICORN_THREADS + DB_MAX_OVERFLOW).
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "3"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
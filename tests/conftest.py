@@ -0,0 +1,84 @@
+"""Shared fixtures for the benchmark and query-budget suites.
+
+The app runs against ``BENCH_DATABASE_URL`` when set (a disposable local
+Postgres database; it is seeded, not cleared) and otherwise against a
+fresh SQLite file in explicit benchmark mode. Dataset sizes come from
+BENCH_WORKERS, BENCH_TASKS, BENCH_MESSAGES and BENCH_PENDING.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+# config.Config reads the environment at import time
+if os.environ.get("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+else:
+    _db_dir = tempfile.mkdtemp(prefix="task-bench-")
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_db_dir, "bench.db")
+    os.environ["ALLOW_SQLITE_BENCHMARK"] = "1"
+os.environ.setdefault("INSTANCE_PATH", tempfile.mkdtemp(prefix="task-instance-"))
+# Background threads and event streams are not under test
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("NOTIFY_STREAM_MAX_CLIENTS", "0")
+
+from app import create_app  # noqa: E402
+from app.models import User  # noqa: E402
+from app.seed import seed  # noqa: E402
+
+PASSWORD = "password"
+
+
+def _size(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(TESTING=True)
+    with app.app_context():
+        seed(
+            workers=_size("BENCH_WORKERS", 20),
+            tasks=_size("BENCH_TASKS", 5000),
+            messages=_size("BENCH_MESSAGES", 20000),
+            pending=_size("BENCH_PENDING", 200),
+            password=PASSWORD,
+        )
+    return app
+
+
+def login(app, username: str):
+    client = app.test_client()
+    response = client.post("/login", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 302, f"login as {username} failed"
+    return client
+
+
+@pytest.fixture(scope="session")
+def owner(app):
+    with app.app_context():
+        user = User.query.filter_by(role="owner").order_by(User.id).first()
+        return user.id, user.username
+
+
+@pytest.fixture(scope="session")
+def worker(app):
+    """The first seeded worker, for worker views."""
+    with app.app_context():
+        user = User.query.filter_by(role="worker").order_by(User.id).first()
+        return user.id, user.username
+
+
+@pytest.fixture(scope="session")
+def owner_client(app, owner):
+    return login(app, owner[1])
+
+
+@pytest.fixture(scope="session")
+def worker_client(app, worker):
+    return login(app, worker[1])
@@ -0,0 +1,90 @@
+"""Route benchmarks (pytest-benchmark): ``pytest tests/test_benchmarks.py``.
+
+Each benchmark drives a route through the Flask test client with the full
+render, so numbers include template and serialization time. Conditional
+requests are not sent, so no response is a 304.
+"""
+import io
+
+from app import notifications
+
+
+def _get(client, url, status=200):
+    response = client.get(url)
+    assert response.status_code == status, url
+    # Drain streamed bodies so their queries are measured too
+    response.get_data()
+    return response
+
+
+def test_tasks_owner(benchmark, owner_client):
+    benchmark(_get, owner_client, "/tasks")
+
+
+def test_tasks_worker(benchmark, worker_client):
+    benchmark(_get, worker_client, "/tasks")
+
+
+def test_tasks_filtered_search(benchmark, owner_client):
+    benchmark(_get, owner_client, "/tasks?status=todo&q=invoice")
+
+
+def test_tasks_deep_page(benchmark, owner_client):
+    first = owner_client.get("/api/tasks?limit=200").get_json()
+    assert first["next_cursor"]
+    benchmark(_get, owner_client, f"/tasks?cursor={first['next_cursor']}")
+
+
+def test_notifications_poll_cached(benchmark, owner_client):
+    benchmark(_get, owner_client, "/notifications/poll")
+
+
+def test_notifications_poll_cold(benchmark, owner_client):
+    benchmark.pedantic(
+        _get,
+        args=(owner_client, "/notifications/poll"),
+        setup=notifications.invalidate,
+        rounds=50,
+    )
+
+
+def test_export_csv_owner(benchmark, owner_client):
+    response = benchmark(_get, owner_client, "/tasks/export")
+    assert response.mimetype == "text/csv"
+
+
+def test_export_csv_worker(benchmark, worker_client):
+    benchmark(_get, worker_client, "/tasks/export")
+
+
+def test_import_csv(benchmark, owner_client, worker):
+    rows = "".join(
+        f"Imported task {i},Benchmark row,todo,medium,2030-01-01,{worker[1]}\n" for i in range(500)
+    )
+    data = ("title,description,status,priority,due_date,assignee\n" + rows).encode("utf-8")
+
+    def upload():
+        response = owner_client.post(
+            "/tasks/import",
+            data={"file": (io.BytesIO(data), "tasks.csv")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200
+
+    benchmark.pedantic(upload, rounds=10)
+
+
+def test_messages_with_owner(benchmark, owner_client, worker):
+    benchmark(_get, owner_client, f"/messages/{worker[0]}")
+
+
+def test_messages_with_worker(benchmark, worker_client, owner):
+    benchmark(_get, worker_client, f"/messages/{owner[0]}")
+
+
+def test_inbox(benchmark, owner_client):
+    benchmark(_get, owner_client, "/messages/inbox")
+
+
+def test_approvals(benchmark, owner_client):
+    benchmark(_get, owner_client, "/approvals")
@@ -0,0 +1,126 @@
+"""Keyset pagination: complete walks and tampered cursors.
+
+Walking every page must return each row exactly once, in both the plain
+and the search ordering. A cursor is client input, so one that decodes to
+values of the wrong type must be rejected like any other bad cursor rather
+than reaching the database.
+"""
+import base64
+import json
+
+import pytest
+
+from app import pagination, search
+from app.models import Message, Task, db
+from app.routes import THREAD_ORDER
+
+
+def _walk(client, url):
+    ids, cursor = [], None
+    while True:
+        page_url = url + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(page_url)
+        assert response.status_code == 200, page_url
+        body = response.get_json()
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize(
+    "who, args",
+    [
+        ("owner", ""),
+        ("worker", ""),
+        ("owner", "&q=invoice"),
+        ("owner", "&status=todo&q=order"),
+    ],
+)
+def test_task_walk_is_complete(app, owner_client, worker_client, worker, who, args):
+    client = owner_client if who == "owner" else worker_client
+    ids = _walk(client, "/api/tasks?limit=97" + args)
+    assert len(ids) == len(set(ids)), "a row appeared on two pages"
+
+    with app.app_context():
+        query = db.session.query(Task.id)
+        if who == "worker":
+            query = query.filter(Task.assignee_id == worker[0])
+        if "status=todo" in args:
+            query = query.filter(Task.status == "todo")
+        if "q=" in args:
+            query, _ = search.apply(query, args.rsplit("q=", 1)[1], db.engine)
+        expected = {task_id for (task_id,) in query}
+    assert ids and set(ids) == expected
+
+
+def test_thread_walk_is_complete(app, owner, worker):
+    with app.app_context():
+        query = Message.query.filter(
+            Message.sender_id.in_([owner[0], worker[0]]),
+            Message.receiver_id.in_([owner[0], worker[0]]),
+        )
+        expected = {m.id for m in query}
+        ids, cursor = [], None
+        while True:
+            page = pagination.paginate(query, THREAD_ORDER, cursor, 7)
+            ids.extend(m.id for m in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+    assert len(ids) == len(set(ids))
+    assert set(ids) == expected
+
+
+def _token(values) -> str:
+    raw = json.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+# Task list cursors are (due date, priority, id)
+TAMPERED_TASK_CURSORS = [
+    "not-base64!",
+    _token({"d": "2026-01-01"}),
+    _token([{"d": "2026-01-01"}, "high"]),
+    _token(["2026-01-01", "high", 1]),
+    _token([{"dt": "2026-01-01T00:00:00"}, "high", 1]),
+    _token([{"d": "2026-13-45"}, "high", 1]),
+    _token([{"d": 5}, "high", 1]),
+    _token([{"x": 1}, "high", 1]),
+    _token([None, "high", 1]),
+    _token([{"d": "2026-01-01"}, 3, 1]),
+    _token([{"d": "2026-01-01"}, "high", True]),
+    _token([{"d": "2026-01-01"}, "high", "1"]),
+    _token([{"d": "2026-01-01"}, "high", 1.5]),
+    _token([{"d": "2026-01-01"}, "high", 10**30]),
+]
+
+
+@pytest.mark.parametrize("cursor", TAMPERED_TASK_CURSORS)
+def test_tampered_task_cursor(owner_client, cursor):
+    assert owner_client.get(f"/api/tasks?cursor={cursor}").status_code == 400
+    assert owner_client.get(f"/tasks?cursor={cursor}").status_code == 302
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [_token(["high", 1]), _token([True, 1]), _token([0.5, "1"])],
+)
+def test_tampered_search_cursor(owner_client, cursor):
+    response = owner_client.get(f"/api/tasks?q=invoice&cursor={cursor}")
+    assert response.status_code == 400
+
+
+# Thread cursors are (created_at, id)
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        _token([{"d": "2026-01-01"}, 1]),
+        _token(["2026-01-01T00:00:00", 1]),
+        _token([{"dt": "2026-01-01T00:00:00"}, {"d": "2026-01-01"}]),
+        _token([{"dt": "yesterday"}, 1]),
+    ],
+)
+def test_tampered_thread_cursor(owner_client, worker, cursor):
+    response = owner_client.get(f"/messages/{worker[0]}?cursor={cursor}")
+    assert response.status_code == 302
@@ -0,0 +1,213 @@
+"""Per-endpoint SQL statement budgets.
+
+Each request is made with the notification and identity caches cleared,
+so the counts are the worst case. They are taken at three dataset sizes,
+growing the seeded data between rounds; a count that changes with the
+data points at an N+1 query.
+
+The warm-up before each round marks the seeded messages read, so opening a
+thread there only exercises the read path. ``UNREAD_BUDGETS`` covers the
+write path: unread messages are inserted just before the measured request,
+in growing numbers, so that one UPDATE marks them all. Caches stay warm
+there, so a commit that fails to invalidate the reader's badge shows up.
+"""
+import pytest
+from sqlalchemy import event, insert, select
+
+from app import identity, notifications
+from app.models import Message, Task, TaskCompletionRequest, db
+from app.seed import seed
+
+
+# (client, url, max statements per request); {owner} and {worker} are
+# replaced with the seeded accounts' ids
+BUDGETS = [
+    ("owner", "/tasks", 6),
+    ("worker", "/tasks", 6),
+    ("owner", "/tasks?status=todo&q=invoice", 6),
+    ("owner", "/api/tasks", 3),
+    ("worker", "/api/tasks", 4),
+    ("owner", "/notifications/poll", 2),
+    ("worker", "/notifications/poll", 2),
+    ("owner", "/tasks/export", 3),
+    ("worker", "/tasks/export", 3),
+    ("owner", "/approvals", 3),
+    ("owner", "/users", 3),
+    ("owner", "/messages/inbox", 3),
+    ("owner", "/messages/{worker}", 7),
+    ("worker", "/messages/{owner}", 6),
+    ("owner", "/messages/{worker}/since?after=0", 4),
+    ("worker", "/messages/{owner}/since?after=0", 5),
+]
+
+# Rows added before the second and third rounds
+GROWTH = {"workers": 5, "tasks": 2000, "messages": 5000, "pending": 100}
+ROUNDS = 3
+
+
+def count_statements(app, client, url, cold: bool = True, data=None) -> int:
+    return len(run_statements(app, client, url, cold, data))
+
+
+def run_statements(app, client, url, cold: bool = True, data=None) -> list:
+    """SQL run by a GET of ``url``, or a POST of ``data`` to it."""
+    if cold:
+        identity.invalidate()
+        notifications.invalidate()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url) if data is None else client.post(url, data=data)
+        # Streamed bodies run their queries while being read
+        response.get_data()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    # Form posts redirect back to a page
+    assert response.status_code == (200 if data is None else 302), url
+    return statements
+
+
+@pytest.fixture(scope="module")
+def measured(app, owner, worker, owner_client, worker_client):
+    clients = {"owner": owner_client, "worker": worker_client}
+    ids = {"owner": owner[0], "worker": worker[0]}
+    counts = {entry: [] for entry in BUDGETS}
+    for round_no in range(ROUNDS):
+        if round_no:
+            with app.app_context():
+                seed(**GROWTH, rng_seed=1000 + round_no)
+        # Leave out one-time, per-process work such as the search backend
+        # check, and mark the newly seeded messages read
+        for who, url, _ in BUDGETS:
+            clients[who].get(url.format(**ids)).get_data()
+        for entry in BUDGETS:
+            who, url, _ = entry
+            counts[entry].append(count_statements(app, clients[who], url.format(**ids)))
+    return counts
+
+
+@pytest.mark.parametrize("entry", BUDGETS, ids=[f"{who}:{url}" for who, url, _ in BUDGETS])
+def test_query_budget(measured, entry):
+    who, url, budget = entry
+    counts = measured[entry]
+    assert max(counts) <= budget, f"{url} as {who} ran {max(counts)} statements (budget {budget})"
+    assert len(set(counts)) == 1, f"{url} as {who}: statement count grows with data {counts}"
+
+
+# (reader, url, max statements) for opening a thread with unread messages,
+# with warm caches
+UNREAD_BUDGETS = [
+    ("owner", "/messages/{worker}", 8),
+    ("worker", "/messages/{owner}", 7),
+    ("owner", "/messages/{worker}/since?after=0", 5),
+    ("worker", "/messages/{owner}/since?after=0", 6),
+]
+UNREAD_SIZES = (1, 20, 200)
+
+
+def _send_unread(app, sender_id: int, receiver_id: int, n: int) -> None:
+    with app.app_context():
+        db.session.execute(
+            insert(Message),
+            [{"sender_id": sender_id, "receiver_id": receiver_id, "body": f"unread {i}"} for i in range(n)],
+        )
+        db.session.commit()
+
+
+@pytest.mark.parametrize("entry", UNREAD_BUDGETS, ids=[f"{who}:{url}" for who, url, _ in UNREAD_BUDGETS])
+def test_read_marking_budget(app, owner, worker, owner_client, worker_client, entry):
+    who, url, budget = entry
+    clients = {"owner": owner_client, "worker": worker_client}
+    ids = {"owner": owner[0], "worker": worker[0]}
+    reader = ids[who]
+    sender = ids["worker" if who == "owner" else "owner"]
+    url = url.format(**ids)
+    client = clients[who]
+
+    def badge() -> int:
+        return client.get("/notifications/poll").get_json()["messages"]
+
+    # Start from a fully read thread; other threads may still be unread
+    client.get(url).get_data()
+    baseline = badge()
+
+    counts = []
+    for n in UNREAD_SIZES:
+        _send_unread(app, sender, reader, n)
+        # Primes the cached badge, which the request itself must invalidate
+        assert badge() == baseline + n
+        counts.append(count_statements(app, client, url, cold=False))
+        assert badge() == baseline, f"{url} as {who}: unread badge not cleared"
+    assert max(counts) <= budget, f"{url} as {who} ran {max(counts)} statements (budget {budget})"
+    assert len(set(counts)) == 1, f"{url} as {who}: statement count grows with unread {counts}"
+
+
+# Statements per bulk decision, however many requests are selected
+BULK_DECISION_BUDGETS = [("approve", 4), ("reject", 3)]
+BATCH_SIZES = (1, 10, 50)
+
+
+def _pending_requests(app, n: int) -> list:
+    """Ids of ``n`` new pending requests, each by its task's assignee."""
+    with app.app_context():
+        tasks = db.session.execute(
+            select(Task.id, Task.assignee_id).where(Task.status != "done").order_by(Task.id).limit(n)
+        ).all()
+        ids = db.session.execute(
+            insert(TaskCompletionRequest).returning(TaskCompletionRequest.id),
+            [{"task_id": task_id, "requested_by_id": assignee_id} for task_id, assignee_id in tasks],
+        ).scalars().all()
+        db.session.commit()
+    assert len(ids) == n
+    return ids
+
+
+@pytest.mark.parametrize("action,budget", BULK_DECISION_BUDGETS)
+def test_bulk_decision_budget(app, owner_client, action, budget):
+    counts = []
+    for n in BATCH_SIZES:
+        ids = _pending_requests(app, n)
+        counts.append(
+            count_statements(
+                app, owner_client, "/approvals/bulk", data={"action": action, "request_ids": ids}
+            )
+        )
+        with app.app_context():
+            statuses = db.session.execute(
+                select(TaskCompletionRequest.status).where(TaskCompletionRequest.id.in_(ids))
+            ).scalars().all()
+        assert set(statuses) == {"approved" if action == "approve" else "rejected"}
+    assert max(counts) <= budget, f"bulk {action} ran {max(counts)} statements (budget {budget})"
+    assert len(set(counts)) == 1, f"bulk {action}: statement count grows with the batch {counts}"
+
+
+def test_broadcast_statements(app, owner_client, worker_client):
+    """A broadcast is one SELECT of the recipients and one INSERT, for any crew size."""
+
+    def badge(client) -> int:
+        return client.get("/notifications/poll").get_json()["messages"]
+
+    shapes = []
+    for round_no in range(ROUNDS):
+        if round_no:
+            with app.app_context():
+                seed(workers=10, tasks=0, messages=0, pending=0, rng_seed=2000 + round_no)
+        # Prime both cached badges; the broadcast must invalidate only the workers'
+        before_worker, before_owner = badge(worker_client), badge(owner_client)
+        statements = run_statements(
+            app,
+            owner_client,
+            "/messages/broadcast",
+            cold=False,
+            data={"target": "all", "body": f"Announcement {round_no}"},
+        )
+        shapes.append([statement.split(None, 1)[0].upper() for statement in statements])
+        assert badge(worker_client) == before_worker + 1
+        assert badge(owner_client) == before_owner
+    assert shapes == [["SELECT", "INSERT"]] * ROUNDS, shapes